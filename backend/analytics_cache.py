@@ -0,0 +1,57 @@
+"""
+On-disk cache for aggregates derived from the processed data files.
+
+Each entry is pickled to data/processed/cache/{name}.pkl together with a
+fingerprint of its source files (mtime + size) and CACHE_VERSION, so it is
+rebuilt automatically when the data is regenerated or the builders change.
+"""
+import os
+import pickle
+
+from config import PROCESSED_DATA_DIR
+
+# Bump when a builder's output changes
+CACHE_VERSION = 2
+
+CACHE_DIR = os.path.join(PROCESSED_DATA_DIR, 'cache')
+
+
+def _fingerprint(source_paths):
+    """(CACHE_VERSION, [(path, mtime, size), ...]) or None if a source is missing."""
+    entries = []
+    for path in source_paths:
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        entries.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return (CACHE_VERSION, entries)
+
+
+def load_or_build(name, builder_fn, source_paths):
+    """
+    Return the cached result of builder_fn() for these source files, calling
+    it (and rewriting the cache) only when the fingerprint does not match.
+    """
+    fingerprint = _fingerprint(source_paths)
+    if fingerprint is None:
+        return builder_fn()
+
+    cache_path = os.path.join(CACHE_DIR, f'{name}.pkl')
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_fingerprint, value = pickle.load(f)
+        if cached_fingerprint == fingerprint:
+            return value
+    except Exception:
+        pass
+
+    value = builder_fn()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((fingerprint, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"⚠️  Could not write cache {name}: {e}")
+    return value
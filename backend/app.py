@@ -6,24 +6,75 @@ Uses trained SVD + Content-Based hybrid model on MovieLens data.
 """
 import os
 import sys
+import json
+import time
+import hashlib
+import threading
+from functools import lru_cache, wraps
 import pandas as pd
 import numpy as np
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from datetime import datetime
-import random
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.insert(0, os.path.dirname(__file__))
 
 # Import configuration
-from config import get_processed_file_path, get_model_file_path, PROCESSED_DATA_DIR, MODEL_DIR
+from config import get_processed_file_path, get_model_file_path, ensure_dirs, PROCESSED_DATA_DIR, MODEL_DIR
+from analytics_cache import load_or_build
+from src.data_store import read_processed
 
 # ── Flask App Setup ──────────────────────────────────────────────────────────
 app = Flask(__name__)
 CORS(app)
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON via orjson for both responses and request bodies. Keys stay sorted
+    and dates/dataclasses still go through Flask's default() hook, so the
+    output matches the stdlib provider.
+    """
+    def dumps(self, obj, **kwargs):
+        option = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS |
+                  orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # orjson.JSONDecodeError subclasses ValueError, so Flask's bad-request
+        # handling for malformed bodies still applies
+        return orjson.loads(s)
+
+
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+# gzip large JSON payloads (analytics, movie lists) for clients that accept it
+if Compress is not None:
+    Compress(app)
+
 # ── Global State ─────────────────────────────────────────────────────────────
 hybrid_recommender = None
 movies_df = None
@@ -33,6 +84,52 @@ tags_df = None
 MODEL_LOADED = False
 poster_cache = {}
 
+# Row-range index into train_df, per-genre movie masks and catalog genre
+# counts (built by build_lookups)
+user_offsets = None
+user_count = 0
+test_user_rows = {}
+genre_masks = {}
+genre_combos = []  # split genre list for each movies_df['genres'] category code
+search_texts = []
+SEARCH_SEP = '\x00'
+
+# train_df columns as compact arrays in the same (userId-sorted) row order
+rating_user_ids = None
+rating_movie_ids = None
+rating_values = None
+history_order = None  # row positions; newest first within each user's block
+
+# Static aggregates for /api/genres and /api/analytics (see build_aggregates)
+genre_counts = pd.Series(dtype='int64')
+rating_distribution = []
+user_activity = []
+
+# Leading rows of the popular/top-rated rankings (see build_rankings)
+RANKING_CACHE_SIZE = 200
+TOP_RATED_THRESHOLDS = (10, 25, 50, 100, 200)
+popular_top = None
+top_rated_by_min = {}
+
+# Per-user rating aggregates and top genres (built by build_user_stats)
+user_stats_df = None
+user_top_genres = {}
+
+# Every movie pre-formatted for the API (built by build_movie_view)
+movies_view_df = None
+movie_records = {}
+
+# Rendered JSON bodies of read-only endpoints, keyed by path + query string.
+# Everything they serve only changes when load_models() runs again.
+RESPONSE_CACHE_TTL = 3600  # seconds
+RESPONSE_CACHE_SIZE = 64
+response_cache = {}
+response_cache_lock = threading.Lock()
+data_version = 0  # bumped by load_models(); part of every response_cache key
+
+# Live-evaluation metrics for /api/analytics, keyed by the sampled user ids
+live_eval_cache = {}
+
 
 def load_poster_cache():
     """Load the TMDB poster cache."""
@@ -41,23 +138,15 @@ def load_poster_cache():
     # Also try local data directory path as fallback
     local_cache_path = os.path.join('data', 'processed', 'poster_cache.json')
     
-    print(f"🔍 DEBUG: Loading poster cache...")
-    print(f"   Config path: {cache_path}")
-    print(f"   Config exists: {os.path.exists(cache_path)}")
-    print(f"   Local path: {local_cache_path}")  
-    print(f"   Local exists: {os.path.exists(local_cache_path)}")
-    
     try:
-        if os.path.exists(cache_path):
-            import json
-            with open(cache_path, 'r') as f:
-                poster_cache = json.load(f)
-            print(f"📷 Loaded {len(poster_cache)} poster paths from cache: {cache_path}")
-        elif os.path.exists(local_cache_path):
-            import json
-            with open(local_cache_path, 'r') as f:
-                poster_cache = json.load(f)
-            print(f"📷 Loaded {len(poster_cache)} poster paths from local cache: {local_cache_path}")
+        path = next((p for p in (cache_path, local_cache_path) if os.path.exists(p)), None)
+        if path is not None:
+            # orjson parses the whole file in one native pass; json is the fallback
+            with open(path, 'rb') as f:
+                raw = orjson.loads(f.read()) if orjson else json.load(f)
+            # JSON keys are strings; key by int tmdbId once so lookups need no conversion
+            poster_cache = {int(k): v for k, v in raw.items()}
+            print(f"📷 Loaded {len(poster_cache)} poster paths from cache: {path}")
         else:
             print("⚠️  No poster cache found. Run fetch_posters.py to fetch movie posters.")
             print(f"   Looked for: {cache_path}")
@@ -69,13 +158,13 @@ def load_poster_cache():
         traceback.print_exc()
         poster_cache = {}
     
-    print(f"🔍 DEBUG: Final poster_cache size: {len(poster_cache)}")
     return len(poster_cache)  # Return size for verification
 
 
 def load_models():
     """Load the trained hybrid recommendation system."""
     global hybrid_recommender, movies_df, train_df, test_df, tags_df, MODEL_LOADED
+    global data_version
 
     try:
         from src.models.hybrid_model import load_hybrid_system
@@ -89,10 +178,10 @@ def load_models():
         # Load extras
         test_ratings_path = get_processed_file_path('test_ratings.csv')
         if os.path.exists(test_ratings_path):
-            test_df = pd.read_csv(test_ratings_path)
+            test_df = read_processed(test_ratings_path)
         tags_path = get_processed_file_path('tags_cleaned.csv')
         if os.path.exists(tags_path):
-            tags_df = pd.read_csv(tags_path)
+            tags_df = read_processed(tags_path)
 
         MODEL_LOADED = True
         print(f"✅ Models loaded! {len(movies_df):,} movies | "
@@ -106,41 +195,311 @@ def load_models():
         try:
             movies_path = get_processed_file_path('movies_cleaned.csv')
             if os.path.exists(movies_path):
-                movies_df = pd.read_csv(movies_path)
+                movies_df = read_processed(movies_path)
                 print(f"  Loaded {len(movies_df):,} movies (data-only mode)")
             train_path = get_processed_file_path('train_ratings.csv')
             if os.path.exists(train_path):
-                train_df = pd.read_csv(train_path)
+                train_df = read_processed(train_path)
                 print(f"  Loaded {len(train_df):,} ratings")
         except Exception as e2:
             print(f"  Data loading also failed: {e2}")
-    
+
+    for frame, dtypes in ((train_df, RATING_DTYPES), (test_df, RATING_DTYPES),
+                          (movies_df, MOVIE_DTYPES), (tags_df, RATING_DTYPES)):
+        narrow_dtypes(frame, dtypes)
+
+    build_lookups()
+    build_user_stats()
+    build_aggregates()
+    build_rankings()
+
     # Load poster cache after movies
     load_poster_cache()
+    build_movie_view()
+
+    # Drop anything computed from the previous data
+    with response_cache_lock:
+        data_version += 1
+        response_cache.clear()
+    live_eval_cache.clear()
+    recommendations_for.cache_clear()
+
+
+# Narrower storage for the loaded frames: ids fit in int32 and ratings sit on
+# a 0.5 grid, so they are exact in float32. avg_rating/rating_std stay float64
+# because they are reported rounded and float32 would shift some roundings.
+RATING_DTYPES = {'userId': 'int32', 'movieId': 'int32', 'rating': 'float32',
+                 'user_encoded': 'int32', 'movie_encoded': 'int32'}
+MOVIE_DTYPES = {'movieId': 'int32', 'year': 'float32', 'imdbId': 'int32', 'tmdbId': 'float32',
+                'movie_encoded': 'int32', 'num_ratings': 'int32'}
+
+
+def narrow_dtypes(frame, dtypes):
+    """
+    Downcast numeric columns in place (the recommender shares these frames),
+    skipping any column whose values would not survive the cast unchanged.
+    """
+    if frame is None:
+        return
+    for col, dtype in dtypes.items():
+        if col not in frame.columns or not pd.api.types.is_numeric_dtype(frame[col]):
+            continue
+        try:
+            narrowed = frame[col].astype(dtype)
+        except (ValueError, TypeError):
+            continue  # e.g. NaN in an integer column
+        if np.array_equal(narrowed.to_numpy(np.float64), frame[col].to_numpy(np.float64), equal_nan=True):
+            frame[col] = narrowed
+
+
+def build_lookups():
+    """
+    Sort train_df by userId once and record where each user's rows start, and
+    index movies_df/tags_df by movieId, so per-request lookups are a slice or
+    a hash probe instead of a full scan. Genre strings are parsed once into
+    boolean masks aligned with movies_df rows and into catalog-wide counts.
+    """
+    global user_offsets, user_count, genre_masks, genre_combos, test_user_rows, search_texts
+    global rating_user_ids, rating_movie_ids, rating_values, history_order
+
+    if train_df is not None and not train_df.empty:
+        train_df.sort_values('userId', kind='stable', inplace=True)
+        train_df.reset_index(drop=True, inplace=True)
+        rating_user_ids = train_df['userId'].to_numpy(np.int32)
+        rating_movie_ids = train_df['movieId'].to_numpy(np.int32)
+        rating_values = train_df['rating'].to_numpy(np.float32)
+        user_offsets = np.searchsorted(rating_user_ids, np.arange(rating_user_ids.max() + 2))
+        user_count = int(np.count_nonzero(np.diff(user_offsets)))
+
+        # Rows ordered by user, then most recent first (ties keep row order)
+        if 'timestamp' in train_df.columns:
+            _, ts_rank = np.unique(train_df['timestamp'].to_numpy(), return_inverse=True)
+            history_order = np.lexsort((-ts_rank.ravel(), rating_user_ids))
+        else:
+            history_order = np.arange(len(train_df))
+
+    # Row positions of each user's held-out ratings (used by analytics)
+    test_user_rows = test_df.groupby('userId').indices if test_df is not None else {}
+
+    # The index is left unnamed so merges on the 'movieId' column stay unambiguous
+    if movies_df is not None:
+        movies_df.index = pd.Index(movies_df['movieId'].values)
+
+        # ~10k movies share under 1k distinct genre strings, so store them as a
+        # category and split each distinct string once
+        movies_df['genres'] = movies_df['genres'].astype('category')
+        genre_codes = movies_df['genres'].cat.codes.to_numpy()  # -1 where missing
+        genre_combos = [str(combo).split('|') for combo in movies_df['genres'].cat.categories]
+
+        # Lowercased once for search
+        movies_df['title_lc'] = movies_df['title'].str.lower()
+        movies_df['genres_lc'] = movies_df['genres'].str.lower()
+        # One string per movie so a query is a single substring test per row
+        search_texts = (
+            movies_df['title_lc'].fillna('') + SEARCH_SEP + movies_df['genres_lc'].fillna('')
+        ).tolist()
+
+        # Missing genres count as '' like an empty genre string
+        codes_by_genre = {'': [-1]} if (genre_codes == -1).any() else {}
+        for code, genres in enumerate(genre_combos):
+            for genre in genres:
+                codes_by_genre.setdefault(genre, []).append(code)
+        genre_masks = {genre: np.isin(genre_codes, codes) for genre, codes in codes_by_genre.items()}
+
+    if tags_df is not None:
+        tags_df.sort_values('movieId', kind='stable', inplace=True)
+        tags_df.index = pd.Index(tags_df['movieId'].values)
+
+
+def _build_genre_counts():
+    """Movies per genre, most common first; ties keep first-seen order like Counter.most_common()."""
+    if movies_df is None:
+        return pd.Series(dtype='int64')
+    return (
+        movies_df['genres'].dropna().astype(str).str.split('|').explode()
+        .value_counts(sort=False)
+        .sort_values(ascending=False, kind='stable')
+        .drop('(no genres listed)', errors='ignore')
+    )
+
+
+def _build_rating_dist():
+    """Number of training ratings at each star value."""
+    if rating_values is None:
+        return []
+    # MovieLens ratings sit on a 0.5 grid, so doubled ratings are bin indices
+    rating_counts = np.bincount(np.rint(rating_values * 2).astype(np.int64))
+    return [
+        {'rating': code / 2, 'count': int(rating_counts[code])}
+        for code in np.nonzero(rating_counts)[0].tolist()
+    ]
+
+
+def _build_user_activity():
+    """Histogram of ratings per user."""
+    if user_offsets is None:
+        return []
+    user_counts = np.diff(user_offsets)
+    user_counts = user_counts[user_counts > 0]
+    edges = np.array([20, 50, 100, 200, 500])
+    labels = ['1-20', '21-50', '51-100', '101-200', '201-500', '500+']
+    # Right-closed bins, e.g. 1-20 is (0, 20]; the last bin is open-ended
+    activity = np.bincount(np.digitize(user_counts, edges, right=True), minlength=len(labels))
+    return [
+        {'range': r, 'count': int(c)}
+        for r, c in zip(labels, activity)
+    ]
+
+
+def build_aggregates():
+    """Load the static genre/rating/activity aggregates, rebuilding them only when the data files change."""
+    global genre_counts, rating_distribution, user_activity
+
+    movies_path = get_processed_file_path('movies_cleaned.csv')
+    train_path = get_processed_file_path('train_ratings.csv')
+    genre_counts = load_or_build('genre_counts', _build_genre_counts, [movies_path])
+    rating_distribution = load_or_build('rating_distribution', _build_rating_dist, [train_path])
+    user_activity = load_or_build('user_activity', _build_user_activity, [train_path])
+
+
+def build_rankings():
+    """Rank movies for /api/movies/popular and /api/movies/top-rated once per data load."""
+    global popular_top, top_rated_by_min
+
+    if movies_df is None:
+        popular_top, top_rated_by_min = None, {}
+        return
+    popular_top = movies_df.nlargest(RANKING_CACHE_SIZE, 'num_ratings')
+    top_rated_by_min = {
+        min_r: movies_df[movies_df['num_ratings'] >= min_r].nlargest(RANKING_CACHE_SIZE, 'avg_rating')
+        for min_r in TOP_RATED_THRESHOLDS
+    }
+
+
+def build_user_stats():
+    """
+    Aggregate every user's ratings once so get_user_stats() is a row lookup.
+    Top genres keep Counter.most_common(5) order: count desc, then the
+    genre first seen in the user's ratings.
+    """
+    global user_stats_df, user_top_genres
+
+    user_stats_df, user_top_genres = None, {}
+    if train_df is None or user_offsets is None:
+        return
+
+    # Segment reductions over the userId-sorted arrays; sums accumulate in float64
+    sizes = np.diff(user_offsets)
+    users = np.nonzero(sizes)[0]
+    starts, counts = user_offsets[users], sizes[users]
+
+    means = np.add.reduceat(rating_values, starts, dtype=np.float64) / counts
+    deviations = rating_values - np.repeat(means, counts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stds = np.sqrt(np.add.reduceat(deviations * deviations, starts) / (counts - 1))
+
+    # Distinct movies per user: sort movie ids within each user's segment
+    order = np.lexsort((rating_movie_ids, rating_user_ids))
+    sorted_movies = rating_movie_ids[order]
+    is_new = np.ones(len(order), dtype=np.int64)
+    is_new[1:] = sorted_movies[1:] != sorted_movies[:-1]
+    is_new[starts] = 1
+
+    user_stats_df = pd.DataFrame({
+        'movies_rated': counts,
+        'avg_rating': means,
+        'rating_std': stds,
+        'total_movies': np.add.reduceat(is_new, starts),
+    }, index=users)
+
+    if movies_df is None:
+        return
+
+    genres_by_movie = movies_df['genres'].dropna().astype(str).str.split('|')
+    rated = pd.DataFrame({
+        'userId': train_df['userId'].values,
+        'genre': train_df['movieId'].map(genres_by_movie).values,
+        'pos': np.arange(len(train_df)),
+    }).dropna(subset=['genre']).explode('genre')
+    # Order of first appearance: rating row, then position in its genre string
+    rated['seen'] = rated['pos'] * 64 + rated.groupby(level=0).cumcount()
+
+    counts = (
+        rated.groupby(['userId', 'genre'], sort=False)
+        .agg(count=('seen', 'size'), first=('seen', 'min'))
+        .reset_index()
+        .sort_values(['userId', 'count', 'first'], ascending=[True, False, True])
+    )
+    top = counts.groupby('userId').head(5)
+    top = top[top['genre'] != '(no genres listed)']
+    user_top_genres = top.groupby('userId')['genre'].agg(list).to_dict()
 
 
 # ── Helper Functions ─────────────────────────────────────────────────────────
 
-def get_poster_path(tmdb_id):
-    """Get poster path for a movie from cache."""
-    global poster_cache
-    print(f"🔍 DEBUG get_poster_path: tmdb_id={tmdb_id}, cache_size={len(poster_cache)}")
-    
-    if tmdb_id is None or pd.isna(tmdb_id):
-        print(f"🔍 DEBUG: tmdb_id is None or NaN")
+def user_slice(user_id):
+    """All train_df rows for a user (empty frame for unknown users)."""
+    if user_offsets is None or not 0 <= user_id < len(user_offsets) - 1:
+        return train_df.iloc[0:0]
+    return train_df.iloc[user_offsets[user_id]:user_offsets[user_id + 1]]
+
+
+def user_movie_ids(user_id):
+    """Ids of the movies a user rated, as a view into rating_movie_ids."""
+    if user_offsets is None or not 0 <= user_id < len(user_offsets) - 1:
+        return np.empty(0, dtype=np.int32)
+    return rating_movie_ids[user_offsets[user_id]:user_offsets[user_id + 1]]
+
+
+def cached_response(view):
+    """
+    Serve repeated requests to a read-only endpoint from response_cache.
+    Only successful, non-streamed responses are stored; error tuples and
+    streamed bodies pass through untouched.
+    Entries are keyed on the data version, path and query string, expire
+    after RESPONSE_CACHE_TTL and are evicted least recently used first.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (data_version, request.path, request.query_string, wants_msgpack())
+        with response_cache_lock:
+            entry = response_cache.pop(key, None)
+            if entry is not None and entry[0] > time.time():
+                response_cache[key] = entry  # most recently used goes last
+                resp = app.response_class(entry[1], mimetype=entry[2])
+                resp.vary.update(entry[3])
+                return resp
+
+        resp = view(*args, **kwargs)
+        if isinstance(resp, Response) and resp.status_code == 200 and not resp.is_streamed:
+            body = resp.get_data()  # outside the lock
+            with response_cache_lock:
+                # Skip storing if the data was reloaded while this request ran
+                if key[0] == data_version:
+                    if len(response_cache) >= RESPONSE_CACHE_SIZE:
+                        response_cache.pop(next(iter(response_cache)))
+                    response_cache[key] = (time.time() + RESPONSE_CACHE_TTL, body,
+                                           resp.mimetype, set(resp.vary))
+        return resp
+    return wrapper
+
+
+def movie_row(movie_id):
+    """The movies_df row for a movie, or None if it is not in the catalog."""
+    if movies_df is None or movie_id not in movies_df.index:
         return None
-    try:
-        tmdb_id_str = str(int(float(tmdb_id)))
-        result = poster_cache.get(tmdb_id_str)
-        print(f"🔍 DEBUG: Looking up '{tmdb_id_str}' -> {result}")
-        return result
-    except (ValueError, TypeError) as e:
-        print(f"🔍 DEBUG: Error converting tmdb_id: {e}")
+    return movies_df.loc[movie_id]
+
+
+def get_poster_path(tmdb_id):
+    """Get poster path for a movie from cache (tmdb_id is an int or None)."""
+    if tmdb_id is None:
         return None
+    return poster_cache.get(tmdb_id)
 
 
-def movie_to_dict(row):
-    """Convert a movies_df row to a JSON-friendly dict."""
+def format_movie(row):
+    """Format a movies_df row (Series or dict) as a JSON-friendly dict."""
     genres_raw = row.get('genres', '')
     if isinstance(genres_raw, str):
         genres_list = [g for g in genres_raw.split('|') if g and g != '(no genres listed)']
@@ -150,8 +509,11 @@ def movie_to_dict(row):
     # TMDB ID for poster fetching
     tmdb_id = int(row['tmdbId']) if pd.notna(row.get('tmdbId')) else None
     
-    # Get poster path from cache
-    poster_path = get_poster_path(tmdb_id)
+    # Poster path: joined onto movies_df by build_movie_view(), else from the cache
+    if 'poster_path' in row:
+        poster_path = row['poster_path'] if pd.notna(row['poster_path']) else None
+    else:
+        poster_path = get_poster_path(tmdb_id)
 
     return {
         'movieId': int(row['movieId']),
@@ -161,42 +523,200 @@ def movie_to_dict(row):
         'genres_str': '|'.join(genres_list),
         'avg_rating': round(float(row.get('avg_rating', 0)), 2),
         'num_ratings': int(row.get('num_ratings', 0)),
-        'imdbId': str(int(row['imdbId'])).zfill(7) if pd.notna(row.get('imdbId')) else None,
+        'imdbId': row['imdbId_str'] if pd.notna(row.get('imdbId_str')) else None,
         'tmdbId': tmdb_id,
         'poster_path': poster_path,
-        'imdb_url': f"https://www.imdb.com/title/tt{str(int(row['imdbId'])).zfill(7)}/"
-                    if pd.notna(row.get('imdbId')) else None,
+        'imdb_url': row['imdb_url'] if pd.notna(row.get('imdb_url')) else None,
     }
 
 
+def build_movie_view():
+    """
+    Format every movie once after the poster cache is loaded, so list
+    endpoints slice movies_view_df and movie_record() is a dict lookup.
+    """
+    global movies_view_df, movie_records
+
+    if movies_df is None:
+        movies_view_df, movie_records = None, {}
+        return
+
+    # Zero-padded IMDb ids and URLs in one vectorized pass (NaN where missing)
+    imdb_ids = movies_df['imdbId'].astype('Int64')
+    movies_df['imdbId_str'] = imdb_ids.astype(str).str.zfill(7).where(imdb_ids.notna())
+    movies_df['imdb_url'] = 'https://www.imdb.com/title/tt' + movies_df['imdbId_str'] + '/'
+
+    # Poster paths joined in one hash-join against the cache instead of a lookup per movie
+    tmdb_ids = movies_df['tmdbId'].astype('Int64')
+    posters = pd.Series(poster_cache, dtype=object)
+    movies_df['poster_path'] = posters.reindex(tmdb_ids.to_numpy(dtype=np.int64, na_value=-1)).to_numpy()
+
+    # Same fields as format_movie(), built column-wise. Nullable columns are
+    # object dtype holding None so they serialize as null rather than NaN.
+    def nullable(col):
+        return col.astype(object).where(col.notna(), None)
+
+    shown = [[g for g in genres if g and g != '(no genres listed)'] for genres in genre_combos]
+    genres = pd.Series(
+        [list(shown[code]) if code >= 0 else [] for code in movies_df['genres'].cat.codes.tolist()],
+        index=movies_df.index,
+    )
+    tmdb_ids = nullable(tmdb_ids)
+
+    movies_view_df = pd.DataFrame({
+        'movieId': movies_df['movieId'].astype('int64'),
+        'title': movies_df['title'].map(str),
+        'year': nullable(movies_df['year'].astype('Int64')),
+        'genres': genres,
+        'genres_str': genres.str.join('|'),
+        'avg_rating': movies_df['avg_rating'].astype(float).map(lambda r: round(r, 2)),
+        'num_ratings': movies_df['num_ratings'].astype('int64'),
+        'imdbId': nullable(movies_df['imdbId_str']),
+        'tmdbId': tmdb_ids,
+        'poster_path': nullable(movies_df['poster_path']),
+        'imdb_url': nullable(movies_df['imdb_url']),
+    }, index=movies_df.index)
+    movie_records = dict(zip(movies_df.index, movies_view_df.to_dict(orient='records')))
+
+
+def movie_record(movie_id):
+    """Formatted dict (a fresh copy) for a movie id, or None if not in the catalog."""
+    record = movie_records.get(movie_id)
+    if record is not None:
+        return dict(record)
+    row = movie_row(movie_id)
+    return format_movie(row) if row is not None else None
+
+
+def movies_to_dicts(frame):
+    """Formatted dicts for a subset of movies_df rows, in frame order."""
+    if movies_view_df is None:
+        return [format_movie(row) for _, row in frame.iterrows()]
+    return movies_view_df.loc[frame.index].to_dict(orient='records')
+
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def wants_msgpack():
+    """True if msgpack is installed and the client's Accept header prefers it to JSON."""
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+def _msgpack_default(obj):
+    # numpy scalars/arrays that slipped into a payload
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f'Cannot serialize {type(obj).__name__}')
+
+
+def serialize(payload):
+    """Respond with MessagePack if the client asks for it (Accept header), else JSON."""
+    if wants_msgpack():
+        body = msgpack.packb(payload, use_bin_type=True, default=_msgpack_default)
+        resp = app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+    else:
+        resp = jsonify(payload)
+    if msgpack is not None:
+        resp.vary.add('Accept')
+    return resp
+
+
+STREAM_MIN_ITEMS = 1000
+
+
+def list_response(payload, list_key):
+    """
+    jsonify(payload), except that a long payload[list_key] is streamed one
+    item at a time instead of being serialized into a single buffer.
+    """
+    items = payload[list_key]
+    if len(items) < STREAM_MIN_ITEMS:
+        return jsonify(payload)
+
+    dumps = app.json.dumps
+
+    def generate():
+        # Same compact, key-sorted layout as jsonify()
+        sep = '{'
+        for key in sorted(payload):
+            yield f'{sep}{dumps(key)}:'
+            sep = ','
+            if key != list_key:
+                yield dumps(payload[key])
+                continue
+            yield '['
+            for i, item in enumerate(items):
+                yield dumps(item) if i == 0 else ',' + dumps(item)
+            yield ']'
+        yield '}\n'
+
+    return app.response_class(generate(), mimetype=app.json.mimetype)
+
+
+@lru_cache(maxsize=4096)
+def demo_user_id(email):
+    """
+    Stable demo user ID (1-610) for an email. blake2s is used instead of
+    hash() so the mapping survives restarts (hash() is salted per process).
+    """
+    digest = hashlib.blake2s(email.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little') % 610 + 1
+
+
+@lru_cache(maxsize=4096)
+def recommendations_for(user_id, top_k, cf_weight):
+    """
+    Hybrid recommendations for a user, enriched with movie metadata.
+    Output is deterministic until load_models() runs, which clears this cache;
+    callers must not mutate the returned list.
+    """
+    recs = hybrid_recommender.recommend_movies(user_id, top_n=top_k, cf_weight=cf_weight)
+
+    # Enrich with movie metadata
+    enriched = []
+    for rec in recs:
+        mid = rec['movieId']
+        base = movie_record(mid)
+        if base is None:
+            base = {'movieId': mid, 'title': rec.get('title', f'Movie {mid}')}
+
+        # Merge recommendation data
+        base.update({
+            'predicted_rating': rec['predicted_rating'],
+            'confidence': rec['confidence'],
+            'cf_score': rec['cf_score'],
+            'content_score': rec['content_score'],
+            'final_score': rec['final_score'],
+            'explanation': rec['explanation']['simple'],
+            'explanations': rec['explanation'],
+            'why_not': rec.get('why_not'),
+        })
+        enriched.append(base)
+
+    return enriched
+
+
 def get_user_stats(user_id):
-    """Compute real stats for a user from the ratings data."""
+    """Real stats for a user from the precomputed rating aggregates."""
     if train_df is None:
         return {}
 
-    user_ratings = train_df[train_df['userId'] == user_id]
-    if user_ratings.empty:
+    if user_stats_df is None or user_id not in user_stats_df.index:
         return {'movies_rated': 0, 'avg_rating': 0, 'favorite_genres': []}
 
-    # Merge with movies to get genres
-    if movies_df is not None:
-        merged = user_ratings.merge(movies_df[['movieId', 'genres']], on='movieId', how='left')
-        all_genres = []
-        for g in merged['genres'].dropna():
-            all_genres.extend(str(g).split('|'))
-        # Count genres
-        from collections import Counter
-        genre_counts = Counter(all_genres)
-        top_genres = [g for g, _ in genre_counts.most_common(5) if g != '(no genres listed)']
-    else:
-        top_genres = []
+    row = user_stats_df.loc[user_id]
+    movies_rated = int(row['movies_rated'])
 
     return {
-        'movies_rated': len(user_ratings),
-        'avg_rating': round(float(user_ratings['rating'].mean()), 2),
-        'rating_std': round(float(user_ratings['rating'].std()), 2) if len(user_ratings) > 1 else 0,
-        'favorite_genres': top_genres,
-        'total_movies': int(user_ratings['movieId'].nunique()),
+        'movies_rated': movies_rated,
+        'avg_rating': round(float(row['avg_rating']), 2),
+        'rating_std': round(float(row['rating_std']), 2) if movies_rated > 1 else 0,
+        'favorite_genres': list(user_top_genres.get(user_id, [])),
+        'total_movies': int(row['total_movies']),
     }
 
 
@@ -214,7 +734,7 @@ def health_check():
         'data_loaded': movies_df is not None,
         'movies_count': len(movies_df) if movies_df is not None else 0,
         'ratings_count': len(train_df) if train_df is not None else 0,
-        'users_count': int(train_df['userId'].nunique()) if train_df is not None else 0,
+        'users_count': user_count if train_df is not None else 0,
         'poster_cache_size': len(poster_cache),
         'message': 'ReelSense++ API with real ML models' if MODEL_LOADED else 'Data-only mode',
     })
@@ -227,8 +747,8 @@ def debug_poster(tmdb_id):
         'tmdb_id': tmdb_id,
         'tmdb_id_str': str(tmdb_id),
         'poster_cache_size': len(poster_cache),
-        'poster_path': poster_cache.get(str(tmdb_id)),
-        'sample_keys': list(poster_cache.keys())[:5] if poster_cache else [],
+        'poster_path': poster_cache.get(tmdb_id),
+        'sample_keys': [str(k) for k in list(poster_cache)[:5]],
     })
 
 
@@ -261,61 +781,53 @@ def get_mood_recommendations(user_id):
         preferred_genres = mood_genres.get(mood, ['Comedy', 'Drama'])
         
         # Filter movies by genre
-        mood_movies = movies_df[
-            movies_df['genres'].fillna('').apply(
-                lambda x: any(genre in x for genre in preferred_genres)
-            )
-        ].copy()
+        mask = np.zeros(len(movies_df), dtype=bool)
+        for genre in preferred_genres:
+            if genre in genre_masks:
+                mask |= genre_masks[genre]
+        mood_movies = movies_df[mask].copy()
         
         if mood_movies.empty:
             return jsonify({'error': f'No movies found for mood: {mood}'}), 404
             
         # If we have a trained model, get personalized scores
         if MODEL_LOADED and hybrid_recommender is not None:
-            # Get user's rating history to avoid already seen movies
-            user_ratings = train_df[train_df['userId'] == user_id]['movieId'].tolist() if train_df is not None else []
-            
             # Remove already rated movies
-            mood_movies = mood_movies[~mood_movies['movieId'].isin(user_ratings)]
+            seen = np.isin(mood_movies['movieId'].values, user_movie_ids(user_id))
+            mood_movies = mood_movies[~seen]
             
             if mood_movies.empty:
                 return jsonify({'error': f'No new {mood} movies found for user'}), 404
             
-            # Get predictions for mood-filtered movies
+            # Score every mood-filtered movie in one batched CF call
+            predictions = hybrid_recommender.cf_model.predict_many(user_id, mood_movies['movieId'].values)
+            confidences = np.minimum(0.8, np.abs(predictions - 2.5) / 2.5)  # Simple confidence
+            
+            # Top top_k by predicted rating (partial sort; ties keep catalog order)
+            from src.models.cf_model import top_n_positions
+            top_positions = top_n_positions(predictions, top_k)
+            
+            mood_ids = mood_movies['movieId'].values
             mood_recs = []
-            for _, row in mood_movies.iterrows():
-                try:
-                    # Get prediction from hybrid model
-                    prediction = hybrid_recommender.cf_model.predict(user_id, row['movieId'])
-                    content_score = hybrid_recommender.content_model.get_user_content_score(
-                        user_id, row['movieId'], train_df
-                    ) if train_df is not None else 0.5
-                    
-                    base = movie_to_dict(row)
-                    base.update({
-                        'predicted_rating': float(prediction),
-                        'confidence': min(0.8, abs(prediction - 2.5) / 2.5),  # Simple confidence
-                        'mood_match': mood,
-                        'explanation': f"Perfect for when you're {mood}! This {'/'.join(preferred_genres[:2]).lower()} movie matches your mood."
-                    })
-                    mood_recs.append(base)
-                except Exception:
-                    # Skip if prediction fails
-                    continue
-                    
-            # Sort by predicted rating and take top_k
-            mood_recs.sort(key=lambda x: x['predicted_rating'], reverse=True)
-            mood_recs = mood_recs[:top_k]
+            for pos in top_positions:
+                base = movie_record(mood_ids[pos])
+                base.update({
+                    'predicted_rating': float(predictions[pos]),
+                    'confidence': float(confidences[pos]),
+                    'mood_match': mood,
+                    'explanation': f"Perfect for when you're {mood}! This {'/'.join(preferred_genres[:2]).lower()} movie matches your mood."
+                })
+                mood_recs.append(base)
             
         else:
             # Fallback: use popularity-based filtering
             mood_movies = mood_movies.sort_values(['avg_rating', 'num_ratings'], 
                                                 ascending=[False, False])
+            top_movies = mood_movies.head(top_k)
             mood_recs = []
-            for _, row in mood_movies.head(top_k).iterrows():
-                base = movie_to_dict(row)
+            for base, avg_rating in zip(movies_to_dicts(top_movies), top_movies['avg_rating'].tolist()):
                 base.update({
-                    'predicted_rating': float(row.get('avg_rating', 3.5)),
+                    'predicted_rating': float(avg_rating),
                     'confidence': 0.6,
                     'mood_match': mood,
                     'explanation': f"Popular {'/'.join(preferred_genres[:2]).lower()} movie perfect for your {mood} mood!"
@@ -350,33 +862,8 @@ def get_recommendations(user_id):
         if not MODEL_LOADED or hybrid_recommender is None:
             return jsonify({'error': 'Models not loaded. Run training first.'}), 503
 
-        # Get real hybrid recommendations
-        recs = hybrid_recommender.recommend_movies(user_id, top_n=top_k, cf_weight=cf_weight)
-
-        # Enrich with movie metadata
-        enriched = []
-        for rec in recs:
-            mid = rec['movieId']
-            movie_row = movies_df[movies_df['movieId'] == mid]
-
-            if not movie_row.empty:
-                row = movie_row.iloc[0]
-                base = movie_to_dict(row)
-            else:
-                base = {'movieId': mid, 'title': rec.get('title', f'Movie {mid}')}
-
-            # Merge recommendation data
-            base.update({
-                'predicted_rating': rec['predicted_rating'],
-                'confidence': rec['confidence'],
-                'cf_score': rec['cf_score'],
-                'content_score': rec['content_score'],
-                'final_score': rec['final_score'],
-                'explanation': rec['explanation']['simple'],
-                'explanations': rec['explanation'],
-                'why_not': rec.get('why_not'),
-            })
-            enriched.append(base)
+        # Get real hybrid recommendations (memoized until the models reload)
+        enriched = recommendations_for(user_id, top_k, cf_weight)
 
         return jsonify({
             'user_id': user_id,
@@ -400,16 +887,13 @@ def get_movie_details(movie_id):
         if movies_df is None:
             return jsonify({'error': 'No data loaded'}), 503
 
-        movie_row = movies_df[movies_df['movieId'] == movie_id]
-        if movie_row.empty:
+        movie = movie_record(movie_id)
+        if movie is None:
             return jsonify({'error': 'Movie not found'}), 404
 
-        row = movie_row.iloc[0]
-        movie = movie_to_dict(row)
-
         # Add tags if available
-        if tags_df is not None:
-            movie_tags = tags_df[tags_df['movieId'] == movie_id]['tag'].tolist()
+        if tags_df is not None and movie_id in tags_df.index:
+            movie_tags = tags_df.loc[[movie_id], 'tag'].tolist()
             movie['tags'] = movie_tags[:20]  # Limit
         else:
             movie['tags'] = []
@@ -419,11 +903,11 @@ def get_movie_details(movie_id):
             similar = hybrid_recommender.content_model.get_similar_movies(movie_id, n=5)
             similar_movies = []
             for sim_id, sim_score in similar:
-                sim_row = movies_df[movies_df['movieId'] == sim_id]
-                if not sim_row.empty:
+                sim_movie = movie_records.get(sim_id)
+                if sim_movie is not None:
                     similar_movies.append({
                         'movieId': int(sim_id),
-                        'title': sim_row.iloc[0]['title'],
+                        'title': sim_movie['title'],
                         'similarity': round(sim_score, 3),
                     })
             movie['similar_movies'] = similar_movies
@@ -441,11 +925,11 @@ def get_explanation(user_id, movie_id):
         if not MODEL_LOADED:
             return jsonify({'error': 'Models not loaded'}), 503
 
-        explanation = hybrid_recommender.explain(user_id, movie_id)
         cf_score = hybrid_recommender.cf_model.predict(user_id, movie_id)
         content_score = hybrid_recommender.content_model.get_user_content_score(
-            user_id, movie_id, train_df
+            user_id, movie_id, user_slice(user_id)
         )
+        explanation = hybrid_recommender.explain(user_id, movie_id, cf_score, content_score)
 
         return jsonify({
             'user_id': user_id,
@@ -475,26 +959,31 @@ def search_movies():
         if not query:
             return jsonify({'query': '', 'results': [], 'count': 0})
 
-        # Search in title and genres
-        mask = (
-            movies_df['title'].str.lower().str.contains(query, na=False) |
-            movies_df['genres'].str.lower().str.contains(query, na=False)
-        )
-        results = movies_df[mask].head(limit)
+        # Search in title and genres (plain substring match, not a regex),
+        # stopping as soon as `limit` matches are found
+        positions = []
+        if SEARCH_SEP not in query:
+            for pos, text in enumerate(search_texts):
+                if query in text:
+                    positions.append(pos)
+                    if len(positions) == limit:
+                        break
+        results = movies_df.iloc[positions[:limit]]
 
-        result_list = [movie_to_dict(row) for _, row in results.iterrows()]
+        result_list = movies_to_dicts(results)
 
-        return jsonify({
+        return list_response({
             'query': query,
             'results': result_list,
             'count': len(result_list),
-        })
+        }, 'results')
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/movies/<int:movie_id>/similar')
+@cached_response
 def get_similar_movies(movie_id):
     """Get movies similar to a given movie (content-based)."""
     try:
@@ -506,9 +995,8 @@ def get_similar_movies(movie_id):
         similar = hybrid_recommender.content_model.get_similar_movies(movie_id, n=n)
         result = []
         for sim_id, sim_score in similar:
-            row = movies_df[movies_df['movieId'] == sim_id]
-            if not row.empty:
-                m = movie_to_dict(row.iloc[0])
+            m = movie_record(sim_id)
+            if m is not None:
                 m['similarity'] = round(sim_score, 3)
                 result.append(m)
 
@@ -594,24 +1082,34 @@ def get_user_history(user_id):
         if train_df is None or movies_df is None:
             return jsonify({'error': 'No data loaded'}), 503
 
-        user_ratings = train_df[train_df['userId'] == user_id].merge(
-            movies_df[['movieId', 'title', 'genres', 'year']], on='movieId', how='left'
-        )
+        user_ratings = user_slice(user_id)
 
-        if 'timestamp' in user_ratings.columns:
-            user_ratings = user_ratings.sort_values('timestamp', ascending=False)
-
-        history = []
-        for _, row in user_ratings.head(50).iterrows():
-            history.append({
-                'movieId': int(row['movieId']),
-                'title': str(row.get('title', '')),
-                'rating': float(row['rating']),
-                'genres': str(row.get('genres', '')),
-                'timestamp': str(row.get('timestamp', '')),
-            })
+        # The 50 most recent ratings, from the per-user order built at load
+        if len(user_ratings):
+            start = user_offsets[user_id]
+            recent = train_df.iloc[history_order[start:start + min(len(user_ratings), 50)]]
+        else:
+            recent = user_ratings
+
+        # Title/genres for just these rows via the movieId index (NaN if unknown)
+        meta = movies_df.reindex(recent['movieId'].values)
+        timestamps = recent['timestamp'].tolist() if 'timestamp' in recent.columns else [''] * len(recent)
+
+        history = [
+            {
+                'movieId': int(mid),
+                'title': str(title),
+                'rating': float(rating),
+                'genres': str(genres),
+                'timestamp': str(ts),
+            }
+            for mid, title, rating, genres, ts in zip(
+                recent['movieId'].tolist(), meta['title'].tolist(), recent['rating'].tolist(),
+                meta['genres'].tolist(), timestamps,
+            )
+        ]
 
-        return jsonify({
+        return serialize({
             'user_id': user_id,
             'history': history,
             'total': len(user_ratings),
@@ -640,6 +1138,7 @@ def mark_watched(user_id):
 
 
 @app.route('/api/movies/popular')
+@cached_response
 def get_popular_movies():
     """Get popular movies by number of ratings."""
     try:
@@ -647,8 +1146,11 @@ def get_popular_movies():
         if movies_df is None:
             return jsonify({'error': 'No data loaded'}), 503
 
-        popular = movies_df.nlargest(n, 'num_ratings')
-        result = [movie_to_dict(row) for _, row in popular.iterrows()]
+        if popular_top is not None and 0 <= n <= RANKING_CACHE_SIZE:
+            popular = popular_top.head(n)
+        else:
+            popular = movies_df.nlargest(n, 'num_ratings')
+        result = movies_to_dicts(popular)
         return jsonify({'movies': result, 'count': len(result)})
 
     except Exception as e:
@@ -656,6 +1158,7 @@ def get_popular_movies():
 
 
 @app.route('/api/movies/top-rated')
+@cached_response
 def get_top_rated_movies():
     """Get top-rated movies (with minimum rating threshold)."""
     try:
@@ -665,9 +1168,12 @@ def get_top_rated_movies():
         if movies_df is None:
             return jsonify({'error': 'No data loaded'}), 503
 
-        qualified = movies_df[movies_df['num_ratings'] >= min_ratings]
-        top = qualified.nlargest(n, 'avg_rating')
-        result = [movie_to_dict(row) for _, row in top.iterrows()]
+        if min_ratings in top_rated_by_min and 0 <= n <= RANKING_CACHE_SIZE:
+            top = top_rated_by_min[min_ratings].head(n)
+        else:
+            qualified = movies_df[movies_df['num_ratings'] >= min_ratings]
+            top = qualified.nlargest(n, 'avg_rating')
+        result = movies_to_dicts(top)
         return jsonify({'movies': result, 'count': len(result), 'min_ratings': min_ratings})
 
     except Exception as e:
@@ -675,20 +1181,14 @@ def get_top_rated_movies():
 
 
 @app.route('/api/genres')
+@cached_response
 def get_genres():
     """Get all available genres with counts."""
     try:
         if movies_df is None:
             return jsonify({'error': 'No data loaded'}), 503
 
-        from collections import Counter
-        all_genres = []
-        for g in movies_df['genres'].dropna():
-            all_genres.extend(str(g).split('|'))
-        genre_counts = Counter(all_genres)
-        genre_counts.pop('(no genres listed)', None)
-
-        genres = [{'name': g, 'count': c} for g, c in genre_counts.most_common()]
+        genres = [{'name': g, 'count': int(c)} for g, c in genre_counts.items()]
         return jsonify({'genres': genres})
 
     except Exception as e:
@@ -696,6 +1196,7 @@ def get_genres():
 
 
 @app.route('/api/stats')
+@cached_response
 def get_system_stats():
     """Get system-wide statistics."""
     try:
@@ -703,7 +1204,7 @@ def get_system_stats():
             'model_loaded': MODEL_LOADED,
             'total_movies': len(movies_df) if movies_df is not None else 0,
             'total_ratings': len(train_df) if train_df is not None else 0,
-            'total_users': int(train_df['userId'].nunique()) if train_df is not None else 0,
+            'total_users': user_count if train_df is not None else 0,
             'total_tags': len(tags_df) if tags_df is not None else 0,
         }
 
@@ -718,6 +1219,7 @@ def get_system_stats():
 
 
 @app.route('/api/analytics')
+@cached_response
 def get_analytics():
     """
     Get full analytics dashboard data: model metrics, diversity stats,
@@ -746,70 +1248,54 @@ def get_analytics():
         # Live evaluation if models loaded
         if MODEL_LOADED and hybrid_recommender is not None and test_df is not None:
             try:
-                from collections import Counter
                 sample_users = test_df['userId'].unique()[:30]
-                precisions, recalls, ndcgs = [], [], []
-                all_recs_ids = []
-
-                for uid in sample_users:
-                    actual = set(test_df[test_df['userId'] == uid]['movieId'].tolist())
-                    recs_raw = hybrid_recommender.recommend(int(uid), top_k=10)
-                    pred_ids = [r[0] for r in recs_raw]
-                    all_recs_ids.extend(pred_ids)
-
-                    hits = len(set(pred_ids) & actual)
-                    precisions.append(hits / 10.0)
-                    recalls.append(hits / max(len(actual), 1))
-                    dcg = sum(1.0 / np.log2(i + 2) for i, pid in enumerate(pred_ids) if pid in actual)
-                    idcg = sum(1.0 / np.log2(i + 2) for i in range(min(len(actual), 10)))
-                    ndcgs.append(dcg / max(idcg, 1e-9))
-
-                result['model_performance']['precision_at_10'] = round(np.mean(precisions), 4)
-                result['model_performance']['recall_at_10'] = round(np.mean(recalls), 4)
-                result['model_performance']['ndcg_at_10'] = round(np.mean(ndcgs), 4)
-                result['model_performance']['map_at_10'] = round(
-                    np.mean([(p if p > 0 else 0) for p in precisions]), 4
-                )
-                coverage = len(set(all_recs_ids)) / max(len(movies_df), 1)
-                result['diversity']['catalog_coverage'] = round(coverage, 4)
+                eval_key = tuple(int(uid) for uid in sample_users)
+
+                if eval_key not in live_eval_cache:
+                    from src.evaluation.metrics import batch_ranking_metrics
+                    pred_ids = np.full((len(sample_users), 10), -1, dtype=np.int64)
+                    actual_lists = []
+                    all_recs_ids = []
+
+                    batch_recs = hybrid_recommender.recommend_batch(list(eval_key), top_k=10)
+                    for row, (uid, recs_raw) in enumerate(zip(sample_users, batch_recs)):
+                        rows = test_user_rows.get(uid, np.empty(0, dtype=np.int64))
+                        actual_lists.append(np.unique(test_df['movieId'].values[rows]))
+                        recs = [r[0] for r in recs_raw]
+                        pred_ids[row, :len(recs)] = recs
+                        all_recs_ids.extend(recs)
+
+                    actual_offsets = np.concatenate([[0], np.cumsum([len(a) for a in actual_lists])])
+                    actual_flat = np.concatenate(actual_lists).astype(np.int64)
+                    precisions, recalls, ndcgs = batch_ranking_metrics(
+                        pred_ids, actual_offsets, actual_flat, 10
+                    )
+
+                    performance = {
+                        'precision_at_10': round(np.mean(precisions), 4),
+                        'recall_at_10': round(np.mean(recalls), 4),
+                        'ndcg_at_10': round(np.mean(ndcgs), 4),
+                        'map_at_10': round(np.mean([(p if p > 0 else 0) for p in precisions]), 4),
+                    }
+                    coverage = len(set(all_recs_ids)) / max(len(movies_df), 1)
+                    live_eval_cache[eval_key] = (performance, round(coverage, 4))
+
+                performance, coverage = live_eval_cache[eval_key]
+                result['model_performance'].update(performance)
+                result['diversity']['catalog_coverage'] = coverage
             except Exception as eval_err:
                 print(f"  Live eval error: {eval_err}")
 
-        # Rating distribution (from real data)
-        if train_df is not None:
-            from collections import Counter
-            rating_counts = Counter(train_df['rating'].values)
-            result['rating_distribution'] = [
-                {'rating': float(r), 'count': int(c)}
-                for r, c in sorted(rating_counts.items())
-            ]
-
-        # Genre breakdown
+        # Rating distribution, genre breakdown and user activity (precomputed)
+        result['rating_distribution'] = rating_distribution
         if movies_df is not None:
-            from collections import Counter
-            all_genres = []
-            for g in movies_df['genres'].dropna():
-                all_genres.extend(str(g).split('|'))
-            genre_counts = Counter(all_genres)
-            genre_counts.pop('(no genres listed)', None)
             result['genre_breakdown'] = [
-                {'genre': g, 'count': c}
-                for g, c in genre_counts.most_common(15)
+                {'genre': g, 'count': int(c)}
+                for g, c in genre_counts.head(15).items()
             ]
+        result['user_activity'] = user_activity
 
-        # User activity histogram (ratings per user)
-        if train_df is not None:
-            user_counts = train_df.groupby('userId').size()
-            bins = [0, 20, 50, 100, 200, 500, 5000]
-            labels = ['1-20', '21-50', '51-100', '101-200', '201-500', '500+']
-            binned = pd.cut(user_counts, bins=bins, labels=labels)
-            activity = binned.value_counts().sort_index()
-            result['user_activity'] = [
-                {'range': str(r), 'count': int(c)}
-                for r, c in activity.items()
-            ]
-
-        return jsonify(result)
+        return serialize(result)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -824,7 +1310,7 @@ def login():
         data = request.get_json()
         email = data.get('email', '')
         # Map to a real user ID (1-610) for demo
-        user_id = (hash(email) % 610) + 1
+        user_id = demo_user_id(email)
         return jsonify({
             'token': f'jwt_{user_id}_{int(datetime.now().timestamp())}',
             'user_id': user_id,
@@ -840,8 +1326,9 @@ def register():
     """Mock registration."""
     try:
         data = request.get_json()
+        # Same id login() will hand out for this email
         return jsonify({
-            'user_id': random.randint(1, 610),
+            'user_id': demo_user_id(data.get('email') or ''),
             'email': data.get('email'),
             'message': 'Registration successful',
         })
@@ -851,16 +1338,24 @@ def register():
 
 # ── Frontend Serving ─────────────────────────────────────────────────────────
 
+# The build only changes on redeploy, so look it up once instead of per request
+FRONTEND_DIR = os.path.join(os.path.dirname(__file__), 'frontend', 'build')
+FRONTEND_EXISTS = os.path.isdir(FRONTEND_DIR)
+FRONTEND_FILES = {
+    os.path.relpath(os.path.join(root, name), FRONTEND_DIR).replace(os.sep, '/')
+    for root, _, names in os.walk(FRONTEND_DIR)
+    for name in names
+} if FRONTEND_EXISTS else set()
+
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_frontend(path):
     """Serve React build or show API info."""
-    frontend_dir = os.path.join(os.path.dirname(__file__), 'frontend', 'build')
-
-    if os.path.exists(frontend_dir):
-        if path and os.path.exists(os.path.join(frontend_dir, path)):
-            return send_from_directory(frontend_dir, path)
-        return send_from_directory(frontend_dir, 'index.html')
+    if FRONTEND_EXISTS:
+        if path in FRONTEND_FILES:
+            return send_from_directory(FRONTEND_DIR, path)
+        return send_from_directory(FRONTEND_DIR, 'index.html')
 
     return jsonify({
         'message': 'ReelSense++ v2.0 API',
@@ -896,10 +1391,37 @@ def internal_error(error):
 # ── Main ─────────────────────────────────────────────────────────────────────
 
 # Load models and data
+ensure_dirs()
 load_models()
 
 # ── Main ─────────────────────────────────────────────────────────────────────
 
+def serve_production(port):
+    """
+    Serve with gunicorn (one worker per CPU, 4 threads each). The models are
+    already loaded in this process, so forked workers share them copy-on-write.
+    Falls back to the Flask server where gunicorn is unavailable (e.g. Windows).
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("⚠️  gunicorn not available, using the Flask development server")
+        app.run(host='0.0.0.0', port=port)
+        return
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'0.0.0.0:{port}')
+            self.cfg.set('workers', os.cpu_count() or 1)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', 4)
+
+        def load(self):
+            return app
+
+    PreloadedApplication().run()
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🎬 ReelSense++ v2.0 - Backend API Server")
@@ -921,4 +1443,7 @@ if __name__ == '__main__':
     print(f"📊 Stats:    http://localhost:{port}/api/stats")
     print("=" * 60)
 
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    if debug:
+        app.run(host='0.0.0.0', port=port, debug=debug)
+    else:
+        serve_production(port)
@@ -53,7 +53,7 @@ def get_encoder_file_path(filename):
     """Get path to encoder file"""
     return os.path.join(ENCODER_DIR, filename)
 
-# Create directories if they don't exist
-os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-os.makedirs(MODEL_DIR, exist_ok=True)
-os.makedirs(ENCODER_DIR, exist_ok=True)
\ No newline at end of file
+def ensure_dirs():
+    """Create the output directories if they don't exist (setup and API startup)"""
+    for directory in (PROCESSED_DATA_DIR, MODEL_DIR, ENCODER_DIR):
+        os.makedirs(directory, exist_ok=True)
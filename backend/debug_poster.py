@@ -1,20 +1,17 @@
 import pandas as pd
-from config import get_processed_file_path
-import json
+from src.data_cache import load_movies, load_poster_cache
 
 # Load movies data
-movies = pd.read_csv(get_processed_file_path('movies_cleaned.csv'))
+movies = load_movies()
 
 # Find Adaptation movie
 adaptation = movies[movies['title'].str.contains('Adaptation', case=False, na=False)]
 print("Adaptation movie details:")
-for _, row in adaptation.iterrows():
-    print(f"Title: {row['title']}, MovieId: {row['movieId']}, TmdbId: {row['tmdbId']}")
+for row in adaptation.itertuples(index=False):
+    print(f"Title: {row.title}, MovieId: {row.movieId}, TmdbId: {row.tmdbId}")
 
 # Load poster cache
-cache_path = get_processed_file_path('poster_cache.json')
-with open(cache_path) as f:
-    cache = json.load(f)
+cache = load_poster_cache()
 
 print(f"\nPoster cache has {len(cache)} entries")
 
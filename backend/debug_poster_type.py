@@ -1,9 +1,7 @@
-import pandas as pd
-from config import get_processed_file_path
-import json
+from src.data_cache import load_movies, load_poster_cache
 
 # Load movies data and find Adaptation
-movies = pd.read_csv(get_processed_file_path('movies_cleaned.csv'))
+movies = load_movies()
 adaptation = movies[movies['movieId'] == 5902].iloc[0]
 
 print("Adaptation row data:")
@@ -12,9 +10,7 @@ print(f"tmdbId value: {adaptation['tmdbId']}")
 print(f"tmdbId repr: {repr(adaptation['tmdbId'])}")
 
 # Load poster cache
-cache_path = get_processed_file_path('poster_cache.json')
-with open(cache_path) as f:
-    cache = json.load(f)
+cache = load_poster_cache()
 
 print(f"\nPoster cache lookup tests:")
 tmdb_raw = adaptation['tmdbId']
@@ -22,11 +18,14 @@ print(f"Raw lookup '{tmdb_raw}': {cache.get(str(tmdb_raw))}")
 print(f"Int lookup '{int(tmdb_raw)}': {cache.get(str(int(tmdb_raw)))}")
 print(f"String lookup '2757': {cache.get('2757')}")
 
-# Test the actual get_poster_path logic
+# Test the actual get_poster_path logic: keys converted to int once, so the
+# float/int tmdbId from the row is looked up directly
+poster_lookup = {int(k): v for k, v in cache.items()}
+
 def test_get_poster_path(tmdb_id):
     if tmdb_id is None:
         return None
-    return cache.get(str(int(tmdb_id)))
+    return poster_lookup.get(tmdb_id)
 
 print(f"\nTest get_poster_path function:")
 print(f"Result: {test_get_poster_path(adaptation['tmdbId'])}")
\ No newline at end of file
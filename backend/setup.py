@@ -9,7 +9,7 @@ import sys
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from config import RAW_DATA_DIR, PROCESSED_DATA_DIR, MODEL_DIR
+from config import RAW_DATA_DIR, PROCESSED_DATA_DIR, MODEL_DIR, ensure_dirs
 import argparse
 
 def check_data_directory():
@@ -110,6 +110,8 @@ def main():
         print("✅ Data directory check completed!")
         return 0
     
+    ensure_dirs()
+    
     success = True
     
     # Run preprocessing
@@ -0,0 +1,69 @@
+"""
+ReelSense++ v2.0 - Shared Data Loader for Tools
+Loads the movies table and poster cache once per file version.
+
+Results are memoized in-process and, when joblib is installed, pickled under
+data/processed/cache/joblib so other scripts (debug tools, notebooks) skip the
+CSV/JSON parse. Entries are keyed on (path, mtime, size), so regenerating a
+file invalidates them. The returned objects are shared: copy before modifying.
+"""
+import os
+import json
+from functools import lru_cache
+
+# Add parent directories to path to import config
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import PROCESSED_DATA_DIR, get_processed_file_path
+from src.data_store import read_processed
+
+try:
+    import joblib
+except ImportError:
+    joblib = None  # in-process memoization only
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to json
+
+if joblib is not None:
+    memory = joblib.Memory(location=os.path.join(PROCESSED_DATA_DIR, 'cache', 'joblib'), verbose=0)
+    disk_cache = memory.cache
+else:
+    def disk_cache(fn):
+        return fn
+
+
+@lru_cache(maxsize=4)
+@disk_cache
+def _read_movies(path, mtime_ns, size):
+    return read_processed(path)
+
+
+@lru_cache(maxsize=1)
+@disk_cache
+def _read_poster_cache(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _version(path):
+    """(mtime_ns, size) of path, used as part of the cache key."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_movies(path=None):
+    """Load movies_cleaned (or the table at path)."""
+    if path is None:
+        path = get_processed_file_path('movies_cleaned.csv')
+    return _read_movies(path, *_version(path))
+
+
+def load_poster_cache(path=None):
+    """Load poster_cache.json (or the file at path) as a {tmdbId: poster_path} dict."""
+    if path is None:
+        path = get_processed_file_path('poster_cache.json')
+    return _read_poster_cache(path, *_version(path))
@@ -0,0 +1,88 @@
+"""
+ReelSense++ v2.0 - Processed Data Storage
+Reads the processed tables from a Parquet snapshot when one is available,
+falling back to the CSV files written by preprocessing.
+
+Snapshots sit next to the CSVs with the same name (train_ratings.parquet,
+...). Preprocessing writes them alongside the CSVs when pyarrow is installed;
+for existing data, create them once with:
+
+    python -m src.data_store
+"""
+import os
+import json
+import pandas as pd
+
+# Add parent directories to path to import config
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import PROCESSED_DATA_DIR
+from src.models.genres import parse_genres
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+except ImportError:
+    pyarrow = None
+
+PROCESSED_FILES = ['train_ratings.csv', 'test_ratings.csv', 'movies_cleaned.csv', 'tags_cleaned.csv']
+# List-valued columns per file, stored as text in the CSV (see write_processed)
+LIST_COLUMNS = {'movies_cleaned.csv': ['genres_list']}
+
+
+def parquet_path(csv_path):
+    """Path of the Parquet snapshot for a processed CSV."""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def read_processed(csv_path, columns=None):
+    """
+    Load a processed table, preferring its Parquet snapshot (columnar, typed,
+    multi-threaded) unless pyarrow is missing or the CSV is newer.
+    columns: optional list of columns to load (both formats skip the rest).
+    """
+    snapshot = parquet_path(csv_path)
+    if pyarrow is not None and os.path.exists(snapshot):
+        if not os.path.exists(csv_path) or os.path.getmtime(snapshot) >= os.path.getmtime(csv_path):
+            return pd.read_parquet(snapshot, engine='pyarrow', columns=columns)
+    return pd.read_csv(csv_path, usecols=columns)
+
+
+def write_processed(df, csv_path, json_columns=()):
+    """
+    Write a processed table as CSV, plus its Parquet snapshot when pyarrow is installed.
+    json_columns: list-valued columns; the CSV stores them as JSON text, the
+        snapshot as native list columns.
+    """
+    csv_df = df
+    if json_columns:
+        csv_df = df.assign(**{col: df[col].map(json.dumps) for col in json_columns})
+    csv_df.to_csv(csv_path, index=False)
+    if pyarrow is not None:
+        df.to_parquet(parquet_path(csv_path), engine='pyarrow', compression='zstd', index=False)
+
+
+def snapshot_processed(data_dir=None):
+    """Write a Parquet snapshot for every processed CSV in data_dir."""
+    if pyarrow is None:
+        raise ImportError("pyarrow is required to write Parquet snapshots (pip install pyarrow)")
+    if data_dir is None:
+        data_dir = PROCESSED_DATA_DIR
+
+    for name in PROCESSED_FILES:
+        csv_path = os.path.join(data_dir, name)
+        if not os.path.exists(csv_path):
+            print(f"  Skipping {name} (not found)")
+            continue
+        df = pd.read_csv(csv_path)
+        # Same native list columns as write_processed() gives the snapshot
+        for col in LIST_COLUMNS.get(name, []):
+            if col in df.columns:
+                df[col] = df[col].map(lambda g: list(parse_genres(g)) if isinstance(g, str) else g)
+        df.to_parquet(parquet_path(csv_path), engine='pyarrow', compression='zstd', index=False)
+        print(f"  {name} -> {os.path.basename(parquet_path(csv_path))} ({len(df):,} rows)")
+
+
+if __name__ == "__main__":
+    print("Writing Parquet snapshots of the processed data...")
+    snapshot_processed()
+    print("✅ Done!")
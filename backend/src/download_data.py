@@ -1,20 +1,39 @@
 import os
 import requests
 import zipfile
-import io
+import tempfile
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None  # download without a progress bar
+
+CHUNK_SIZE = 1 << 20  # 1 MB
 
 def download_movielens_small(target_dir='data/raw'):
     url = "https://files.grouplens.org/datasets/movielens/ml-latest-small.zip"
     if not os.path.exists(target_dir):
         os.makedirs(target_dir)
-        
+
     print(f"Downloading dataset from {url}...")
-    r = requests.get(url)
-    z = zipfile.ZipFile(io.BytesIO(r.content))
-    
-    print("Extracting files...")
-    # The zip contains a folder ml-latest-small
-    z.extractall(target_dir)
+    # Stream to a temp file so memory use stays constant for larger datasets
+    tmp = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
+    try:
+        with tmp, requests.get(url, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            chunks = r.iter_content(CHUNK_SIZE)
+            if tqdm is not None:
+                total = int(r.headers.get('Content-Length', 0)) or None
+                chunks = tqdm(chunks, total=total and -(-total // CHUNK_SIZE), unit='MB')
+            for chunk in chunks:
+                tmp.write(chunk)
+
+        print("Extracting files...")
+        # The zip contains a folder ml-latest-small
+        with zipfile.ZipFile(tmp.name) as z:
+            z.extractall(target_dir)
+    finally:
+        os.unlink(tmp.name)
     print(f"Dataset downloaded and extracted to {target_dir}")
 
 if __name__ == "__main__":
@@ -2,7 +2,6 @@
 ReelSense++ v2.0 - Full System Evaluation
 Evaluates CF, Content-Based, and Hybrid models on multiple metrics.
 """
-import pandas as pd
 import numpy as np
 import os
 import sys
@@ -13,7 +12,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from src.models.cf_model import CFModelSVD
 from src.models.hybrid_model import HybridRecommender, ContentBasedModel, load_hybrid_system
 from src.models.diversity_optim import DiversityOptimizer
-from src.evaluation.metrics import precision_at_k, recall_at_k, ndcg_at_k, intra_list_diversity, catalog_coverage
+from src.evaluation.metrics import batch_ranking_metrics, intra_list_diversity, catalog_coverage
+from src.data_store import read_processed
 
 
 def evaluate_cf_rmse(cf_model, test_df):
@@ -22,49 +22,78 @@ def evaluate_cf_rmse(cf_model, test_df):
     return rmse, mae
 
 
+def relevant_items_csr(test_df, users):
+    """
+    Each user's held-out movies as int64 CSR arrays (offsets, flat), in the order
+    of users and sorted within a user, as batch_ranking_metrics expects.
+    """
+    pairs = test_df[['userId', 'movieId']].drop_duplicates().sort_values(['userId', 'movieId'])
+    pair_users = pairs['userId'].to_numpy()
+    pair_movies = pairs['movieId'].to_numpy(np.int64)
+
+    starts = np.searchsorted(pair_users, users, side='left')
+    lengths = np.searchsorted(pair_users, users, side='right') - starts
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    # Position j of user u's block maps to starts[u] + j in the sorted pairs
+    gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+    return offsets, pair_movies[gather]
+
+
 def evaluate_recommendations(hybrid, div_opt, test_df, movies_df, n_users=50, top_k=10):
     """Evaluate recommendation quality across multiple users."""
     test_users = test_df['userId'].unique()
     if len(test_users) > n_users:
-        np.random.seed(42)
-        test_users = np.random.choice(test_users, n_users, replace=False)
+        rng = np.random.default_rng(42)
+        test_users = rng.choice(test_users, n_users, replace=False)
+    n_eval = len(test_users)
 
+    # One preallocated array per metric, filled by user position
     metrics = {
-        'Precision@10': [],
-        'Recall@10': [],
-        'NDCG@10': [],
-        'Diversity': [],
-        'Diversity_MMR': [],
+        'Precision@10': np.empty(n_eval),
+        'Recall@10': np.empty(n_eval),
+        'NDCG@10': np.empty(n_eval),
+        'Diversity': np.empty(n_eval),
+        'Diversity_MMR': np.empty(n_eval),
     }
 
-    all_recs = []
-    all_mmr_recs = []
+    # Distinct recommended movies, for catalog coverage
+    all_recs = set()
+    all_mmr_recs = set()
+    rec_ids = np.full((n_eval, top_k), -1, dtype=np.int64)  # -1 pads short lists
 
-    print(f"  Evaluating on {len(test_users)} users...")
+    print(f"  Evaluating on {n_eval} users...")
     start = time.time()
 
     for i, user_id in enumerate(test_users):
-        actual = test_df[test_df['userId'] == user_id]['movieId'].tolist()
-
         # Hybrid recommendations
         hybrid_recs_raw = hybrid.recommend(user_id, top_k=top_k)
         hybrid_ids = [r[0] for r in hybrid_recs_raw]
-        all_recs.extend(hybrid_ids)
+        all_recs.update(hybrid_ids)
+        rec_ids[i, :len(hybrid_ids[:top_k])] = hybrid_ids[:top_k]
+
+        # Content similarities between the candidates, shared by MMR and both diversity scores
+        sims = hybrid.content_model.similarity_matrix(hybrid_ids)
+        position = {movie_id: j for j, movie_id in enumerate(hybrid_ids)}
 
         # MMR diversity-optimized recommendations
-        mmr_recs_raw = div_opt.mmr_rerank(user_id, hybrid_recs_raw, top_k=top_k, lambda_param=0.5)
+        mmr_recs_raw = div_opt.mmr_rerank(user_id, hybrid_recs_raw, top_k=top_k, lambda_param=0.5, sim_matrix=sims)
         mmr_ids = [r[0] for r in mmr_recs_raw]
-        all_mmr_recs.extend(mmr_ids)
+        all_mmr_recs.update(mmr_ids)
+        mmr_pos = [position[movie_id] for movie_id in mmr_ids]
 
-        # Compute metrics
-        metrics['Precision@10'].append(precision_at_k(actual, hybrid_ids, k=top_k))
-        metrics['Recall@10'].append(recall_at_k(actual, hybrid_ids, k=top_k))
-        metrics['NDCG@10'].append(ndcg_at_k(actual, hybrid_ids, k=top_k))
-        metrics['Diversity'].append(intra_list_diversity(hybrid_ids, hybrid))
-        metrics['Diversity_MMR'].append(intra_list_diversity(mmr_ids, hybrid))
+        # Diversity is per list; ranking metrics are batched after the loop
+        metrics['Diversity'][i] = intra_list_diversity(hybrid_ids, hybrid, sim_matrix=sims)
+        metrics['Diversity_MMR'][i] = intra_list_diversity(mmr_ids, hybrid, sim_matrix=sims[np.ix_(mmr_pos, mmr_pos)])
 
         if (i + 1) % 10 == 0:
-            print(f"    Processed {i+1}/{len(test_users)} users...")
+            print(f"    Processed {i+1}/{n_eval} users...")
+
+    # Precision/recall/NDCG for all users at once (compiled with numba when installed)
+    actual_offsets, actual_flat = relevant_items_csr(test_df, test_users)
+    precisions, recalls, ndcgs = batch_ranking_metrics(rec_ids, actual_offsets, actual_flat, top_k)
+    metrics['Precision@10'][:] = precisions
+    metrics['Recall@10'][:] = recalls
+    metrics['NDCG@10'][:] = ndcgs
 
     elapsed = time.time() - start
     print(f"  Evaluation completed in {elapsed:.1f}s")
@@ -83,9 +112,10 @@ def main():
 
     # Load data
     print("\n[1] Loading data...")
-    train_df = pd.read_csv('data/processed/train_ratings.csv')
-    test_df = pd.read_csv('data/processed/test_ratings.csv')
-    movies_df = pd.read_csv('data/processed/movies_cleaned.csv')
+    # Only the columns the evaluation uses (Parquet snapshots skip the rest on disk)
+    train_df = read_processed('data/processed/train_ratings.csv', columns=['userId'])
+    test_df = read_processed('data/processed/test_ratings.csv', columns=['userId', 'movieId', 'rating'])
+    movies_df = read_processed('data/processed/movies_cleaned.csv', columns=['movieId'])
     print(f"  Train: {len(train_df):,} | Test: {len(test_df):,} | Movies: {len(movies_df):,}")
 
     # Load hybrid system
@@ -114,8 +144,8 @@ def main():
 
     print(f"\n  Recommendation Quality (avg over 50 users):")
     for metric_name, values in metrics.items():
-        mean_val = np.mean(values)
-        std_val = np.std(values)
+        mean_val = values.mean()
+        std_val = values.std()
         print(f"    {metric_name:<20} {mean_val:.4f}  (±{std_val:.4f})")
 
     print(f"\n  Coverage:")
@@ -140,7 +170,7 @@ def main():
 
         f.write("Recommendation Quality (50 users, top-10)\n")
         for metric_name, values in metrics.items():
-            f.write(f"  {metric_name}: {np.mean(values):.4f} (±{np.std(values):.4f})\n")
+            f.write(f"  {metric_name}: {values.mean():.4f} (±{values.std():.4f})\n")
 
         f.write(f"\nCatalog Coverage\n")
         f.write(f"  Hybrid: {coverage_hybrid:.4f}\n")
@@ -2,6 +2,15 @@ import pandas as pd
 import numpy as np
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the kernels below run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 def precision_at_k(actual, predicted, k=10):
     act_set = set(actual)
     pred_set = set(predicted[:k])
@@ -14,14 +23,60 @@ def recall_at_k(actual, predicted, k=10):
     if not act_set: return 0
     return len(act_set & pred_set) / float(len(act_set))
 
+# Rank discounts 1/log2(rank + 1) for the default k=10
+_DCG_WEIGHTS = 1.0 / np.log2(np.arange(2, 12))
+
+def _dcg_weights(k):
+    return _DCG_WEIGHTS if k <= len(_DCG_WEIGHTS) else 1.0 / np.log2(np.arange(2, k + 2))
+
 def ndcg_at_k(actual, predicted, k=10):
     act_set = set(actual)
-    idcg = sum([1.0 / np.log2(i + 2) for i in range(min(len(act_set), k))])
-    dcg = sum([1.0 / np.log2(i + 2) if predicted[i] in act_set else 0 for i in range(min(len(predicted), k))])
+    weights = _dcg_weights(k).tolist()
+    idcg = sum(weights[:min(len(act_set), k)])
+    dcg = sum([weights[i] for i in range(min(len(predicted), k)) if predicted[i] in act_set])
     return dcg / idcg if idcg > 0 else 0
 
-def intra_list_diversity(movie_ids, hybrid_recommender):
+@njit(cache=True)
+def batch_ranking_metrics(pred_ids, actual_offsets, actual_flat, k):
+    """
+    Precision/recall/NDCG@k for a batch of users in one compiled loop.
+    pred_ids: int64[U, k] ranked predictions per user, padded with -1.
+    actual_offsets/actual_flat: CSR layout of each user's sorted relevant ids.
+    """
+    n_users = pred_ids.shape[0]
+    precision = np.zeros(n_users)
+    recall = np.zeros(n_users)
+    ndcg = np.zeros(n_users)
+    inv_log2 = 1.0 / np.log2(np.arange(2, k + 2))
+
+    for u in range(n_users):
+        actual = actual_flat[actual_offsets[u]:actual_offsets[u + 1]]
+        n_actual = actual.shape[0]
+        hits = 0
+        dcg = 0.0
+        for i in range(k):
+            pid = pred_ids[u, i]
+            if pid < 0:
+                continue
+            j = np.searchsorted(actual, pid)
+            if j < n_actual and actual[j] == pid:
+                hits += 1
+                dcg += inv_log2[i]
+        idcg = 0.0
+        for i in range(min(n_actual, k)):
+            idcg += inv_log2[i]
+
+        precision[u] = hits / k
+        recall[u] = hits / max(n_actual, 1)
+        ndcg[u] = dcg / max(idcg, 1e-9)
+
+    return precision, recall, ndcg
+
+def intra_list_diversity(movie_ids, hybrid_recommender, sim_matrix=None):
+    # sim_matrix: optional precomputed similarities of movie_ids (row/col i = movie_ids[i])
     if len(movie_ids) < 2: return 0
+    if sim_matrix is not None:
+        return 1 - np.mean(sim_matrix[np.triu_indices(len(movie_ids), k=1)])
     sims = []
     for i in range(len(movie_ids)):
         for j in range(i + 1, len(movie_ids)):
@@ -29,7 +84,8 @@ def intra_list_diversity(movie_ids, hybrid_recommender):
     return 1 - np.mean(sims) # Diversity is 1 - average similarity
 
 def catalog_coverage(all_recommended_ids, total_movies_count):
-    unique_recs = set(all_recommended_ids)
+    # Accepts a set of ids directly (no copy) or any iterable with repeats
+    unique_recs = all_recommended_ids if isinstance(all_recommended_ids, (set, frozenset)) else set(all_recommended_ids)
     return len(unique_recs) / total_movies_count
 
 if __name__ == "__main__":
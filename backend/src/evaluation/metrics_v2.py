@@ -7,6 +7,8 @@ import numpy as np
 from collections import Counter
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 
+from models.genres import parse_genres
+
 # ===== Traditional Ranking Metrics =====
 
 def precision_at_k(actual, predicted, k=10):
@@ -78,7 +80,7 @@ def genre_entropy(recommendations, movies_df):
     for rec in recommendations:
         movie_id = rec['movieId']
         movie_data = movies_df[movies_df['movieId'] == movie_id].iloc[0]
-        genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+        genres = parse_genres(movie_data['genres'])
         all_genres.extend(genres)
     
     genre_counts = Counter(all_genres)
@@ -120,7 +122,7 @@ def discovery_joy_score(recommendations, user_profile, movies_df):
     for rec in recommendations:
         movie_id = rec['movieId']
         movie_data = movies_df[movies_df['movieId'] == movie_id].iloc[0]
-        genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+        genres = parse_genres(movie_data['genres'])
         
         if any(g not in explored_genres for g in genres):
             new_genre_count += 1
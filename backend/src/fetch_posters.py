@@ -6,11 +6,34 @@ Uses TMDB API to get poster_path for each movie.
 import os
 import json
 import time
+import sqlite3
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # fall back to the thread pool
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to json
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx's HTTP/2 support)
+except ImportError:
+    httpx = None  # requests session (HTTP/1.1 keep-alive)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -22,27 +45,130 @@ TMDB_BASE_URL = 'https://api.themoviedb.org/3'
 # Cache file path
 CACHE_DIR = Path(__file__).parent.parent / 'data' / 'processed'
 POSTER_CACHE_FILE = CACHE_DIR / 'poster_cache.json'
+# Fetch results are written here row by row while fetching; the JSON file the
+# API reads is exported once at the end of each run
+POSTER_DB_FILE = CACHE_DIR / 'poster_cache.db'
+
+# TMDB allows roughly 40 requests per 10 seconds
+RATE_LIMIT_REQUESTS = 40
+RATE_LIMIT_WINDOW = 10.0  # seconds
 
-# Create a session for connection pooling
-session = requests.Session()
-session.headers.update({
+# Concurrent requests while fetching (the rate limiter caps throughput)
+MAX_WORKERS = 32
+
+HEADERS = {
     'User-Agent': 'ReelSense++ Movie Recommender/2.0',
     'Accept': 'application/json'
-})
+}
+
+if httpx is not None:
+    # HTTP/2: concurrent requests are multiplexed over one kept-alive TLS connection
+    session = httpx.Client(
+        http2=True,
+        headers=HEADERS,
+        limits=httpx.Limits(max_connections=MAX_WORKERS, max_keepalive_connections=MAX_WORKERS)
+    )
+else:
+    # Create a session for connection pooling, with one pooled connection per worker
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_maxsize=MAX_WORKERS))
+    session.headers.update(HEADERS)
+
+# Errors worth retrying, from whichever client is in use
+CONNECTION_ERRORS = (requests.exceptions.ConnectionError,
+                     requests.exceptions.Timeout,
+                     ConnectionResetError)
+if httpx is not None:
+    CONNECTION_ERRORS += (httpx.TransportError,)
+
+
+class RateLimiter:
+    """Thread-safe limiter allowing max_calls acquire() calls per rolling window."""
+
+    def __init__(self, max_calls, window):
+        self.max_calls = max_calls
+        self.window = window
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= self.window:
+                self.calls.popleft()
+            if len(self.calls) < self.max_calls:
+                self.calls.append(now)
+                return 0
+            return self.window - (now - self.calls[0])
+
+    def acquire(self):
+        """Block until another request fits in the window."""
+        wait = self.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.reserve()
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        wait = self.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.reserve()
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)
+
+
+@lru_cache(maxsize=1)
+def _parse_poster_cache(path, mtime_ns, size):
+    """Parse the cache file; memoized per file version (path, mtime, size)."""
+    data = Path(path).read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 def load_poster_cache():
-    """Load existing poster cache."""
+    """
+    Load existing poster cache. The file is only re-parsed after it changes, so
+    the returned dict is shared between calls: copy it before modifying.
+    """
     if POSTER_CACHE_FILE.exists():
-        with open(POSTER_CACHE_FILE, 'r') as f:
-            return json.load(f)
+        stat = POSTER_CACHE_FILE.stat()
+        return _parse_poster_cache(str(POSTER_CACHE_FILE), stat.st_mtime_ns, stat.st_size)
     return {}
 
 
+@lru_cache(maxsize=1)
+def _poster_lookup(path, mtime_ns, size):
+    """The parsed cache keyed by int tmdbId, built once per file version."""
+    return {int(k): v for k, v in _parse_poster_cache(path, mtime_ns, size).items()}
+
+
 def save_poster_cache(cache):
     """Save poster cache to file."""
-    with open(POSTER_CACHE_FILE, 'w') as f:
-        json.dump(cache, f, indent=2)
+    if orjson is not None:
+        POSTER_CACHE_FILE.write_bytes(orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+    else:
+        with open(POSTER_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+
+def open_poster_db():
+    """Open the SQLite result store, creating its table if needed."""
+    conn = sqlite3.connect(POSTER_DB_FILE)
+    conn.execute('CREATE TABLE IF NOT EXISTS poster (tmdb_id INTEGER PRIMARY KEY, path TEXT)')
+    return conn
+
+
+def load_poster_db():
+    """Rows of the SQLite result store as a cache dict ({'862': poster_path})."""
+    if not POSTER_DB_FILE.exists():
+        return {}
+    conn = open_poster_db()
+    try:
+        return {str(tmdb_id): path for tmdb_id, path in conn.execute('SELECT tmdb_id, path FROM poster')}
+    finally:
+        conn.close()
 
 
 def fetch_poster_from_tmdb(tmdb_id, retries=3, backoff=1.0):
@@ -56,6 +182,7 @@ def fetch_poster_from_tmdb(tmdb_id, retries=3, backoff=1.0):
             params = {'api_key': TMDB_API_KEY}
             
             # Use session for connection pooling
+            rate_limiter.acquire()
             response = session.get(url, params=params, timeout=15)
             
             if response.status_code == 200:
@@ -73,9 +200,7 @@ def fetch_poster_from_tmdb(tmdb_id, retries=3, backoff=1.0):
                 print(f"  Warning: TMDB API returned {response.status_code} for tmdb_id={tmdb_id}")
                 return None
                 
-        except (requests.exceptions.ConnectionError, 
-                requests.exceptions.Timeout,
-                ConnectionResetError) as e:
+        except CONNECTION_ERRORS:
             if attempt < retries - 1:
                 wait_time = backoff * (2 ** attempt)
                 print(f"  Connection error for tmdb_id={tmdb_id}, retrying in {wait_time}s... (attempt {attempt + 1}/{retries})")
@@ -90,65 +215,144 @@ def fetch_poster_from_tmdb(tmdb_id, retries=3, backoff=1.0):
     return None
 
 
-def fetch_all_posters(movies_df, batch_size=50, delay=0.5):
+async def fetch_poster_from_tmdb_async(http, tmdb_id, retries=3, backoff=1.0):
+    """fetch_poster_from_tmdb() on an aiohttp session."""
+    if not TMDB_API_KEY:
+        return None
+    
+    url = f"{TMDB_BASE_URL}/movie/{tmdb_id}"
+    params = {'api_key': TMDB_API_KEY}
+    for attempt in range(retries):
+        try:
+            await rate_limiter.acquire_async()
+            async with http.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data.get('poster_path')
+                elif response.status == 404:
+                    return None
+                elif response.status == 429:
+                    # Rate limited - wait longer
+                    wait_time = backoff * (2 ** attempt)
+                    print(f"  Rate limited, waiting {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                    continue
+                else:
+                    print(f"  Warning: TMDB API returned {response.status} for tmdb_id={tmdb_id}")
+                    return None
+                
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt < retries - 1:
+                wait_time = backoff * (2 ** attempt)
+                print(f"  Connection error for tmdb_id={tmdb_id}, retrying in {wait_time}s... (attempt {attempt + 1}/{retries})")
+                await asyncio.sleep(wait_time)
+            else:
+                print(f"  Failed to fetch tmdb_id={tmdb_id} after {retries} attempts")
+                return None
+        except Exception as e:
+            print(f"  Unexpected error for tmdb_id={tmdb_id}: {e}")
+            return None
+    
+    return None
+
+
+def _fetch_threaded(todo, on_result, max_workers):
+    """Fetch todo on a thread pool, passing each (tmdb_id, poster_path) to on_result."""
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(fetch_poster_from_tmdb, tmdb_id): tmdb_id for tmdb_id in todo}
+        # Results are handled here on the calling thread, so on_result needs no lock
+        for future in as_completed(futures):
+            on_result(futures[future], future.result())
+    finally:
+        # On Ctrl+C, drop queued requests
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _fetch_async(todo, on_result, max_workers):
+    """Fetch todo with aiohttp, at most max_workers requests in flight."""
+    semaphore = asyncio.Semaphore(max_workers)
+    connector = aiohttp.TCPConnector(limit=max_workers)
+    timeout = aiohttp.ClientTimeout(total=15)
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as http:
+        async def fetch(tmdb_id):
+            async with semaphore:
+                return tmdb_id, await fetch_poster_from_tmdb_async(http, tmdb_id)
+        
+        # on_result runs on the event loop thread, one result at a time
+        for task in asyncio.as_completed([fetch(tmdb_id) for tmdb_id in todo]):
+            on_result(*await task)
+
+
+def fetch_all_posters(movies_df, batch_size=500, max_workers=MAX_WORKERS):
     """
     Fetch poster paths for all movies with TMDB IDs.
-    Respects rate limits with delay between requests.
+    Requests run concurrently: on a thread pool sharing one HTTP/2 connection
+    when httpx is installed, else with aiohttp, else on a thread pool over the
+    requests session. The shared rate limiter keeps them within TMDB's budget.
     Args:
-        batch_size: Save cache every N requests
-        delay: Seconds to wait between requests (increased to avoid connection resets)
+        batch_size: Commit results to the SQLite store every N completed requests
+        max_workers: Number of concurrent requests
     """
-    cache = load_poster_cache()
+    cache = dict(load_poster_cache())
+    
+    # Results of a run that was killed before it could export the JSON
+    missing = object()
+    recovered = {k: v for k, v in load_poster_db().items() if cache.get(k, missing) != v}
+    if recovered:
+        cache.update(recovered)
+        save_poster_cache(cache)
+        print(f"♻️  Recovered {len(recovered)} results from an interrupted run")
     
-    # Filter movies with TMDB IDs
-    movies_with_tmdb = movies_df[movies_df['tmdbId'].notna()].copy()
-    print(f"📽️  Found {len(movies_with_tmdb)} movies with TMDB IDs")
+    # Distinct TMDB IDs as cache keys ('862'), converted once
+    tmdb_ids = movies_df['tmdbId'].dropna().astype('int64').astype(str)
+    print(f"📽️  Found {len(tmdb_ids)} movies with TMDB IDs")
+    tmdb_ids = set(tmdb_ids)
     
-    # Count how many are already cached
-    cached_count = sum(1 for tmdb_id in movies_with_tmdb['tmdbId'] 
-                       if str(int(tmdb_id)) in cache)
-    print(f"✅ Already cached: {cached_count}")
+    # Split into cached and missing with set operations on the cache keys
+    cached_count = len(tmdb_ids & cache.keys())
+    print(f"✅ Already cached: {cached_count} of {len(tmdb_ids)} TMDB IDs")
     
-    to_fetch = len(movies_with_tmdb) - cached_count
+    todo = list(tmdb_ids - cache.keys())
+    to_fetch = len(todo)
     if to_fetch == 0:
         print("All posters are cached!")
         return cache
     
-    print(f"🔄 Fetching {to_fetch} posters from TMDB...")
-    print(f"⏱️  Using {delay}s delay between requests to avoid connection issues")
+    print(f"🔄 Fetching {to_fetch} posters from TMDB with {max_workers} workers...")
+    print(f"⏱️  Rate limited to {RATE_LIMIT_REQUESTS} requests per {RATE_LIMIT_WINDOW:.0f}s")
     
     fetched = 0
     errors = 0
+    db = open_poster_db()
     
-    for idx, row in movies_with_tmdb.iterrows():
-        tmdb_id = int(row['tmdbId'])
-        tmdb_id_str = str(tmdb_id)
-        
-        # Skip if already cached
-        if tmdb_id_str in cache:
-            continue
-        
-        # Fetch from TMDB with retry logic
-        poster_path = fetch_poster_from_tmdb(tmdb_id)
-        
+    def record(tmdb_id, poster_path):
+        nonlocal fetched, errors
         if poster_path:
-            cache[tmdb_id_str] = poster_path
+            cache[tmdb_id] = poster_path
             fetched += 1
         else:
-            cache[tmdb_id_str] = None  # Cache failures too
+            cache[tmdb_id] = None  # Cache failures too
             errors += 1
+        # One row per result instead of rewriting the whole cache file
+        db.execute('INSERT OR REPLACE INTO poster VALUES (?, ?)', (int(tmdb_id), cache[tmdb_id]))
         
-        # Progress and save more frequently
         if (fetched + errors) % batch_size == 0:
+            db.commit()  # Save every batch
             print(f"  Progress: {fetched + errors}/{to_fetch} (fetched: {fetched}, errors: {errors})")
-            save_poster_cache(cache)  # Save every batch
-            print(f"  💾 Cache saved (total: {len(cache)} entries)")
-        
-        # Rate limiting - wait between requests
-        time.sleep(delay)
     
-    # Final save
-    save_poster_cache(cache)
+    try:
+        if aiohttp is not None and httpx is None:
+            asyncio.run(_fetch_async(todo, record, max_workers))
+        else:
+            _fetch_threaded(todo, record, max_workers)
+    finally:
+        # Keep what was fetched so far, even on Ctrl+C
+        db.commit()
+        db.close()
+        save_poster_cache(cache)
+    
     print(f"\n✅ Done! Fetched {fetched} posters, {errors} errors")
     print(f"📁 Cache saved to: {POSTER_CACHE_FILE}")
     print(f"📊 Total cached entries: {len(cache)}")
@@ -157,14 +361,22 @@ def fetch_all_posters(movies_df, batch_size=50, delay=0.5):
 
 
 def get_poster_path(tmdb_id, cache=None):
-    """Get poster path for a movie from cache."""
-    if cache is None:
-        cache = load_poster_cache()
-    
+    """
+    Get poster path for a movie from cache.
+    Without an explicit cache this is one lookup in the int-keyed view of the
+    cache file: ints, floats and numpy scalars hash equal, so tmdb_id needs no
+    conversion (NaN/NA simply miss).
+    """
     if tmdb_id is None:
         return None
     
-    return cache.get(str(int(tmdb_id)))
+    if cache is not None:
+        return cache.get(str(int(tmdb_id)))
+    
+    if not POSTER_CACHE_FILE.exists():
+        return None
+    stat = POSTER_CACHE_FILE.stat()
+    return _poster_lookup(str(POSTER_CACHE_FILE), stat.st_mtime_ns, stat.st_size).get(tmdb_id)
 
 
 if __name__ == '__main__':
@@ -184,7 +396,8 @@ if __name__ == '__main__':
         print(f"❌ Movies file not found: {movies_path}")
         exit(1)
     
-    movies_df = pd.read_csv(movies_path)
+    # Nullable integers, so IDs don't round-trip through float
+    movies_df = pd.read_csv(movies_path, dtype={'tmdbId': 'Int64'})
     print(f"\n📊 Loaded {len(movies_df)} movies")
     
     # Fetch posters
@@ -19,6 +19,8 @@ class BERTMovieEmbedder:
         self.model = SentenceTransformer(model_name)
         self.movie_embeddings = None
         self.movie_ids = None
+        self._row_of = None  # movieId -> row, built on first get_embeddings()
+        self.similarity_matrix = None  # optional float16 item-item cosine matrix, memory-mapped
         
     def prepare_movie_text(self, movies_df):
         """
@@ -49,12 +51,17 @@ class BERTMovieEmbedder:
         movies_df = self.prepare_movie_text(movies_df)
         
         print(f"Generating BERT embeddings for {len(movies_df)} movies...")
+        # One batched pass over the corpus (on GPU when available); unit-length
+        # rows make every similarity below a plain dot product
         self.movie_embeddings = self.model.encode(
             movies_df['semantic_text'].tolist(),
             show_progress_bar=True,
-            batch_size=32
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True
         )
         self.movie_ids = movies_df['movieId'].values
+        self._row_of = self.similarity_matrix = None
         
         print(f"Embeddings shape: {self.movie_embeddings.shape}")
         
@@ -65,48 +72,130 @@ class BERTMovieEmbedder:
         idx = np.where(self.movie_ids == movie_id)[0][0]
         return self.movie_embeddings[idx]
     
+    def _build_index(self):
+        """movieId -> row lookup, built once."""
+        if self._row_of is None:
+            # First occurrence wins, like get_embedding()
+            self._row_of = {}
+            for i, mid in enumerate(self.movie_ids.tolist()):
+                self._row_of.setdefault(mid, i)
+
+    def get_embeddings(self, movie_ids):
+        """
+        L2-normalized embeddings for movie_ids as a (len(movie_ids), dim) matrix;
+        unknown movies get zero rows, so their cosine similarity to anything is 0.
+        """
+        self._build_index()
+        rows = np.array([self._row_of.get(mid, -1) for mid in movie_ids], dtype=np.int64)
+        out = np.zeros((len(rows), self.movie_embeddings.shape[1]), dtype=self.movie_embeddings.dtype)
+        known = rows >= 0
+        out[known] = self.movie_embeddings[rows[known]]
+        return out
+
     def compute_similarity(self, movie_id1, movie_id2):
         """Compute cosine similarity between two movies."""
-        emb1 = self.get_embedding(movie_id1)
-        emb2 = self.get_embedding(movie_id2)
+        self._build_index()
+        i = self._row_of.get(movie_id1)
+        j = self._row_of.get(movie_id2)
         
-        if emb1 is None or emb2 is None:
+        if i is None or j is None:
             return 0.0
+        if self.similarity_matrix is not None:
+            return float(self.similarity_matrix[i, j])
         
-        # Cosine similarity
-        return np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
+        # Cosine similarity of unit vectors
+        return float(self.movie_embeddings[i] @ self.movie_embeddings[j])
     
     def find_similar_movies(self, movie_id, top_k=10):
         """Find most similar movies based on BERT embeddings."""
-        emb = self.get_embedding(movie_id)
-        if emb is None:
+        self._build_index()
+        idx = self._row_of.get(movie_id)
+        if idx is None or top_k <= 0:
             return []
         
-        # Compute similarities with all movies
-        similarities = np.dot(self.movie_embeddings, emb) / (
-            np.linalg.norm(self.movie_embeddings, axis=1) * np.linalg.norm(emb)
-        )
+        # Compute similarities with all movies, excluding the movie itself
+        if self.similarity_matrix is not None:
+            similarities = self.similarity_matrix[idx].astype(np.float32)
+        else:
+            similarities = self.movie_embeddings @ self.movie_embeddings[idx]
+        similarities[idx] = -np.inf
         
-        # Get top-k (excluding self)
-        top_indices = np.argsort(similarities)[::-1][1:top_k+1]
+        # Get top-k: partition, then sort only the k best
+        k = min(top_k, len(similarities) - 1)
+        if k <= 0:
+            return []
+        top_indices = np.argpartition(similarities, -k)[-k:]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
         return [(self.movie_ids[i], similarities[i]) for i in top_indices]
     
+    @staticmethod
+    def _embeddings_path(path):
+        """Sidecar .npy file for the embedding matrix, next to the pickle."""
+        return f"{os.path.splitext(path)[0]}.npy"
+
+    @staticmethod
+    def _similarity_path(path):
+        """Sidecar .npy file for the item-item similarity matrix."""
+        return f"{os.path.splitext(path)[0]}.sim.npy"
+
+    def save_similarity_matrix(self, path='data/processed/bert_embeddings.pkl', block_size=1024):
+        """
+        Precompute all pairwise cosine similarities as float16 (about 200MB for
+        10k movies) next to the embeddings at path. Rows are written block by
+        block, so the full float32 product is never held in memory. Afterwards
+        compute_similarity() is a single array lookup. Call after save(), which
+        removes a matrix left over from earlier embeddings.
+        """
+        unit = self.movie_embeddings
+        n = len(unit)
+        sim_path = self._similarity_path(path)
+        os.makedirs(os.path.dirname(sim_path), exist_ok=True)
+        S = np.lib.format.open_memmap(sim_path, mode='w+', dtype=np.float16, shape=(n, n))
+        for start in range(0, n, block_size):
+            S[start:start + block_size] = unit[start:start + block_size] @ unit.T
+        S.flush()
+        del S
+        self.similarity_matrix = np.load(sim_path, mmap_mode='r')
+        print(f"Similarity matrix saved to {sim_path}")
+
     def save(self, path='data/processed/bert_embeddings.pkl'):
-        """Save embeddings to disk."""
+        """Save embeddings to disk; the matrix goes to a .npy file so load() can memory-map it."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(self._embeddings_path(path), self.movie_embeddings)
         with open(path, 'wb') as f:
             pickle.dump({
-                'embeddings': self.movie_embeddings,
                 'movie_ids': self.movie_ids
             }, f)
+        # A similarity matrix from earlier embeddings no longer matches; rebuild
+        # it with save_similarity_matrix()
+        sim_path = self._similarity_path(path)
+        if os.path.exists(sim_path):
+            os.remove(sim_path)
         print(f"Embeddings saved to {path}")
     
     def load(self, path='data/processed/bert_embeddings.pkl'):
         """Load pre-computed embeddings."""
         with open(path, 'rb') as f:
             data = pickle.load(f)
-            self.movie_embeddings = data['embeddings']
             self.movie_ids = data['movie_ids']
+        if 'embeddings' in data:
+            # Older pickles hold the matrix inline and unnormalized
+            emb = data['embeddings']
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            self.movie_embeddings = emb / np.where(norms > 0, norms, 1)
+        else:
+            # Written by fit() + save(), already unit-length
+            self.movie_embeddings = np.load(self._embeddings_path(path), mmap_mode='r')
+        self._row_of = None
+        self.similarity_matrix = None
+        sim_path = self._similarity_path(path)
+        if os.path.exists(sim_path):
+            S = np.load(sim_path, mmap_mode='r')
+            n = len(self.movie_ids)
+            if S.shape == (n, n):
+                self.similarity_matrix = S
+            else:
+                print(f"⚠️ Ignoring {sim_path}: shape {S.shape} does not match {n} movies")
         print(f"Embeddings loaded from {path}")
 
 if __name__ == "__main__":
@@ -116,6 +205,7 @@ if __name__ == "__main__":
     embedder = BERTMovieEmbedder()
     embedder.fit(movies)
     embedder.save()
+    embedder.save_similarity_matrix()
     
     # Test similarity
     test_movie_id = movies.iloc[0]['movieId']
@@ -10,6 +10,145 @@ from scipy.sparse.linalg import svds
 import pickle
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit, prange, get_num_threads
+except ImportError:
+    njit = None  # numba is optional; SGD falls back to the NumPy epoch below
+
+
+def top_n_positions(scores, n):
+    """
+    Positions of the n highest scores, best first, with ties in their original
+    order: the same as np.argsort(-scores, kind='stable')[:n], but only the
+    scores tied with or above the n-th best are sorted.
+    """
+    neg = -np.asarray(scores)
+    if n >= len(neg):
+        return np.argsort(neg, kind='stable')[:n]
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = np.partition(neg, n - 1)[n - 1]
+    if kth != kth:  # NaN: fewer than n real scores, keep the full-sort NaN placement
+        return np.argsort(neg, kind='stable')[:n]
+    top = np.flatnonzero(neg <= kth)
+    return top[np.argsort(neg[top], kind='stable')[:n]]
+
+
+def _sgd_epoch_numpy(P, Q, bu, bi, user_indices, movie_indices, ratings, perm, lr, reg, global_mean):
+    """One SGD pass over the ratings in perm order, updating the parameters in place. Returns the summed squared error."""
+    total_loss = np.float64(0)  # float32 errors, float64 running sum
+    for idx in perm:
+        u = user_indices[idx]
+        i = movie_indices[idx]
+        r = ratings[idx]
+
+        # Predicted rating
+        pred = global_mean + bu[u] + bi[i] + np.dot(P[u], Q[i])
+        err = r - pred
+        total_loss += err ** 2
+
+        # Update biases
+        bu[u] += lr * (err - reg * bu[u])
+        bi[i] += lr * (err - reg * bi[i])
+
+        # Update factors
+        P_u = P[u].copy()
+        P[u] += lr * (err * Q[i] - reg * P[u])
+        Q[i] += lr * (err * P_u - reg * Q[i])
+    return total_loss
+
+
+def _sgd_epoch_batched(P, Q, bu, bi, user_indices, movie_indices, ratings, perm, lr, reg, global_mean, batch_size):
+    """
+    Mini-batch variant of _sgd_epoch_numpy(): the gradients of batch_size
+    ratings are computed from the same parameters and applied together, so
+    each batch is a few vectorized operations. This approximates sequential
+    SGD (updates within a batch do not see each other). Returns the summed
+    squared error.
+    """
+    total_loss = np.float64(0)
+    for start in range(0, len(perm), batch_size):
+        batch = perm[start:start + batch_size]
+        u = user_indices[batch]
+        i = movie_indices[batch]
+        Pu = P[u]
+        Qi = Q[i]
+
+        err = ratings[batch] - (global_mean + bu[u] + bi[i] + np.einsum('ij,ij->i', Pu, Qi))
+        total_loss += np.dot(err, err)
+
+        # np.add.at accumulates repeated users/movies within a batch
+        np.add.at(bu, u, lr * (err - reg * bu[u]))
+        np.add.at(bi, i, lr * (err - reg * bi[i]))
+        np.add.at(P, u, lr * (err[:, None] * Qi - reg * Pu))
+        np.add.at(Q, i, lr * (err[:, None] * Pu - reg * Qi))
+    return total_loss
+
+
+def _predict_sgd_numpy(global_mean, bu, bi, P, Q, u, i):
+    """Clipped SGD prediction for a known user index u and movie index i."""
+    return float(min(max(global_mean + bu[u] + bi[i] + np.dot(P[u], Q[i]), 0.5), 5.0))
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _sgd_step(P, Q, bu, bi, u, i, r, lr, reg, global_mean):
+        """Update the parameters for one rating; returns its squared error."""
+        n_factors = P.shape[1]
+        dot = np.float32(0.0)  # keeps the update in the parameters' float32
+        for f in range(n_factors):
+            dot += P[u, f] * Q[i, f]
+        err = r - (global_mean + bu[u] + bi[i] + dot)
+
+        bu[u] += lr * (err - reg * bu[u])
+        bi[i] += lr * (err - reg * bi[i])
+
+        for f in range(n_factors):
+            p_uf = P[u, f]
+            P[u, f] += lr * (err * Q[i, f] - reg * p_uf)
+            Q[i, f] += lr * (err * p_uf - reg * Q[i, f])
+        return err * err
+
+    @njit(fastmath=True, cache=True, nogil=True)  # nogil: the next shuffle runs meanwhile
+    def _sgd_epoch(P, Q, bu, bi, user_indices, movie_indices, ratings, perm, lr, reg, global_mean):
+        """Compiled _sgd_epoch_numpy(), with the factor math as explicit scalar loops."""
+        total_loss = 0.0
+        for idx in perm:
+            total_loss += _sgd_step(P, Q, bu, bi, user_indices[idx], movie_indices[idx],
+                                    ratings[idx], lr, reg, global_mean)
+        return total_loss
+
+    @njit(parallel=True, fastmath=True, cache=True, nogil=True)
+    def _sgd_epoch_hogwild(P, Q, bu, bi, user_indices, movie_indices, ratings, perm, lr, reg, global_mean, n_chunks):
+        """
+        Hogwild! variant of _sgd_epoch(): each thread takes a contiguous chunk of
+        perm and updates the shared parameters without locks. Collisions are rare
+        on sparse ratings, but results are no longer bit-for-bit reproducible.
+        """
+        n_ratings = perm.shape[0]
+        losses = np.zeros(n_chunks)
+        for t in prange(n_chunks):
+            loss = 0.0
+            for k in range(t * n_ratings // n_chunks, (t + 1) * n_ratings // n_chunks):
+                idx = perm[k]
+                loss += _sgd_step(P, Q, bu, bi, user_indices[idx], movie_indices[idx],
+                                  ratings[idx], lr, reg, global_mean)
+            losses[t] = loss
+        return losses.sum()
+
+    @njit(cache=True)
+    def _predict_sgd(global_mean, bu, bi, P, Q, u, i):
+        """Compiled _predict_sgd_numpy(): one call, no row views or NumPy dispatch."""
+        dot = 0.0
+        for f in range(P.shape[1]):
+            dot += P[u, f] * Q[i, f]
+        return min(max(global_mean + bu[u] + bi[i] + dot, 0.5), 5.0)
+else:
+    _sgd_epoch = _sgd_epoch_numpy
+    _sgd_epoch_hogwild = None
+    _predict_sgd = _predict_sgd_numpy
 
 
 class CFModelSVD:
@@ -21,12 +160,18 @@ class CFModelSVD:
       - Bias terms for users and items
     """
 
-    def __init__(self, n_factors=50, n_epochs=20, lr=0.005, reg=0.02, method='sgd'):
+    # Parameter arrays, saved as .npy files beside the model pickle
+    ARRAY_ATTRS = ('P', 'Q', 'bu', 'bi', 'user_factors', 'sigma', 'item_factors', 'US', 'rating_matrix_mean')
+
+    def __init__(self, n_factors=50, n_epochs=20, lr=0.005, reg=0.02, method='sgd', parallel=False,
+                 batch_size=None):
         self.n_factors = n_factors
         self.n_epochs = n_epochs
         self.lr = lr
         self.reg = reg
         self.method = method  # 'svd' or 'sgd'
+        self.parallel = parallel  # Hogwild! multi-threaded SGD (needs numba; not reproducible)
+        self.batch_size = batch_size  # mini-batch SGD when set (approximate; see _sgd_epoch_batched)
 
         # Mappings
         self.user_to_idx = {}
@@ -45,20 +190,27 @@ class CFModelSVD:
         self.user_factors = None
         self.sigma = None
         self.item_factors = None
+        self.US = None  # user_factors @ sigma, so predictions need one dot product
         self.rating_matrix_mean = None
 
+        # Vectorized versions of the mappings, built on first use
+        self._user_lookup = None
+        self._movie_lookup = None
+
         self.train_time = 0
 
     def fit(self, train_df):
         """Train the model on the training data."""
-        # Build mappings
-        users = train_df['userId'].unique()
-        movies = train_df['movieId'].unique()
+        # Build mappings: one pass gives every row's index and the ids in
+        # order of first appearance
+        user_codes, users = pd.factorize(train_df['userId'])
+        movie_codes, movies = pd.factorize(train_df['movieId'])
 
-        self.user_to_idx = {u: i for i, u in enumerate(users)}
-        self.idx_to_user = {i: u for u, i in self.user_to_idx.items()}
-        self.movie_to_idx = {m: i for i, m in enumerate(movies)}
-        self.idx_to_movie = {i: m for m, i in self.movie_to_idx.items()}
+        self.user_to_idx = dict(zip(users, range(len(users))))
+        self.idx_to_user = dict(enumerate(users))
+        self.movie_to_idx = dict(zip(movies, range(len(movies))))
+        self.idx_to_movie = dict(enumerate(movies))
+        self._user_lookup = self._movie_lookup = None
 
         n_users = len(users)
         n_movies = len(movies)
@@ -71,138 +223,226 @@ class CFModelSVD:
         start = time.time()
 
         if self.method == 'svd':
-            self._fit_svd(train_df, n_users, n_movies)
+            self._fit_svd(train_df, user_codes, movie_codes, n_users, n_movies)
         else:
-            self._fit_sgd(train_df, n_users, n_movies)
+            self._fit_sgd(train_df, user_codes, movie_codes, n_users, n_movies)
 
         self.train_time = time.time() - start
         print(f"  Training complete in {self.train_time:.1f}s")
 
-    def _fit_svd(self, train_df, n_users, n_movies):
-        """Truncated SVD on the sparse rating matrix."""
-        rows = train_df['userId'].map(self.user_to_idx).values
-        cols = train_df['movieId'].map(self.movie_to_idx).values
+    def _fit_svd(self, train_df, rows, cols, n_users, n_movies):
+        """Truncated SVD on the sparse rating matrix (rows/cols: each rating's user/movie index)."""
         vals = train_df['rating'].values.astype(np.float64)
 
         # Build sparse matrix
         sparse_matrix = csr_matrix((vals, (rows, cols)), shape=(n_users, n_movies))
 
-        # Compute mean per user for centering
-        user_means = np.array(sparse_matrix.sum(axis=1)).flatten()
-        user_counts = np.array((sparse_matrix > 0).sum(axis=1)).flatten()
-        user_counts[user_counts == 0] = 1
-        user_means = user_means / user_counts
+        # Compute mean per user for centering (ratings are > 0, so a row's
+        # stored entries are exactly its rated movies)
+        user_counts = np.diff(sparse_matrix.indptr)
+        user_sums = np.asarray(sparse_matrix.sum(axis=1)).ravel()
+        user_means = user_sums / np.maximum(user_counts, 1)
         self.rating_matrix_mean = user_means
 
-        # Center the matrix
-        for i in range(n_users):
-            row_start = sparse_matrix.indptr[i]
-            row_end = sparse_matrix.indptr[i + 1]
-            sparse_matrix.data[row_start:row_end] -= user_means[i]
+        # Center the matrix: each stored entry minus its row's mean
+        sparse_matrix.data -= np.repeat(user_means, user_counts)
 
         # Truncated SVD
         k = min(self.n_factors, min(n_users, n_movies) - 1)
         print(f"  Computing truncated SVD with k={k}...")
-        U, sigma, Vt = svds(sparse_matrix.astype(float), k=k)
+        U, sigma, Vt = svds(sparse_matrix.astype(np.float32), k=k)
 
         self.user_factors = U
         self.sigma = np.diag(sigma)
         self.item_factors = Vt
+        # sigma is diagonal: scale the columns of U instead of a k x k product per query
+        self.US = U * sigma[np.newaxis, :]
 
-    def _fit_sgd(self, train_df, n_users, n_movies):
+    def _fit_sgd(self, train_df, user_indices, movie_indices, n_users, n_movies):
         """SGD-based matrix factorization with biases (like Funk SVD)."""
         np.random.seed(42)
-        self.P = np.random.normal(0, 0.1, (n_users, self.n_factors))
-        self.Q = np.random.normal(0, 0.1, (n_movies, self.n_factors))
-        self.bu = np.zeros(n_users)
-        self.bi = np.zeros(n_movies)
-
-        # Prepare training data as arrays
-        user_indices = train_df['userId'].map(self.user_to_idx).values
-        movie_indices = train_df['movieId'].map(self.movie_to_idx).values
-        ratings = train_df['rating'].values.astype(np.float64)
+        # float32 parameters: half the memory traffic of float64 per update
+        self.P = np.random.normal(0, 0.1, (n_users, self.n_factors)).astype(np.float32)
+        self.Q = np.random.normal(0, 0.1, (n_movies, self.n_factors)).astype(np.float32)
+        self.bu = np.zeros(n_users, dtype=np.float32)
+        self.bi = np.zeros(n_movies, dtype=np.float32)
+
+        # Prepare training data as arrays; int32 indices halve the gather traffic
+        ratings = train_df['rating'].values.astype(np.float32)
+        index_dtype = np.int32 if len(ratings) < 2**31 else np.int64
+        user_indices = user_indices.astype(index_dtype)
+        movie_indices = movie_indices.astype(index_dtype)
+        lr, reg, global_mean = np.float32(self.lr), np.float32(self.reg), np.float32(self.global_mean)
 
         n_ratings = len(ratings)
 
-        for epoch in range(self.n_epochs):
-            # Shuffle
-            perm = np.random.permutation(n_ratings)
-            total_loss = 0
-
-            for idx in perm:
-                u = user_indices[idx]
-                i = movie_indices[idx]
-                r = ratings[idx]
-
-                # Predicted rating
-                pred = self.global_mean + self.bu[u] + self.bi[i] + np.dot(self.P[u], self.Q[i])
-                err = r - pred
-                total_loss += err ** 2
-
-                # Update biases
-                self.bu[u] += self.lr * (err - self.reg * self.bu[u])
-                self.bi[i] += self.lr * (err - self.reg * self.bi[i])
-
-                # Update factors
-                P_u = self.P[u].copy()
-                self.P[u] += self.lr * (err * self.Q[i] - self.reg * self.P[u])
-                self.Q[i] += self.lr * (err * P_u - self.reg * self.Q[i])
-
-            rmse = np.sqrt(total_loss / n_ratings)
-            if (epoch + 1) % 5 == 0 or epoch == 0:
-                print(f"    Epoch {epoch+1:>2}/{self.n_epochs} - Train RMSE: {rmse:.4f}")
+        batched = bool(self.batch_size)
+        hogwild = not batched and self.parallel and _sgd_epoch_hogwild is not None
+        if batched:
+            print(f"  Mini-batch SGD, batch size {self.batch_size}")
+        elif hogwild:
+            n_threads = get_num_threads()
+            print(f"  Hogwild! SGD on {n_threads} threads")
+        elif self.parallel:
+            print("  ⚠️  numba not installed, running single-threaded SGD")
+
+        # Shuffle the next epoch's order in the background while this one trains.
+        # One draw is in flight at a time, so the RNG sequence (and the model)
+        # is the same as shuffling inline.
+        with ThreadPoolExecutor(max_workers=1) as shuffler:
+            next_perm = shuffler.submit(np.random.permutation, n_ratings)
+            for epoch in range(self.n_epochs):
+                perm = next_perm.result().astype(index_dtype)
+                if epoch + 1 < self.n_epochs:
+                    next_perm = shuffler.submit(np.random.permutation, n_ratings)
+
+                if batched:
+                    total_loss = _sgd_epoch_batched(self.P, self.Q, self.bu, self.bi,
+                                                    user_indices, movie_indices, ratings, perm,
+                                                    lr, reg, global_mean, self.batch_size)
+                elif hogwild:
+                    total_loss = _sgd_epoch_hogwild(self.P, self.Q, self.bu, self.bi,
+                                                    user_indices, movie_indices, ratings, perm,
+                                                    lr, reg, global_mean, n_threads)
+                else:
+                    total_loss = _sgd_epoch(self.P, self.Q, self.bu, self.bi,
+                                            user_indices, movie_indices, ratings, perm,
+                                            lr, reg, global_mean)
+
+                rmse = np.sqrt(total_loss / n_ratings)
+                if (epoch + 1) % 5 == 0 or epoch == 0:
+                    print(f"    Epoch {epoch+1:>2}/{self.n_epochs} - Train RMSE: {rmse:.4f}")
+
+    @staticmethod
+    def _lookup_indices(lookup, ids):
+        """Indices of ids in a lookup Series (id -> index), -1 for unknown ids."""
+        pos = lookup.index.get_indexer(ids)
+        return np.where(pos >= 0, lookup.to_numpy()[pos], -1)
+
+    def _user_indices(self, user_ids):
+        """user_to_idx for an array of ids, in one vectorized lookup."""
+        if self._user_lookup is None:
+            self._user_lookup = pd.Series(self.user_to_idx, dtype=np.int64)
+        return self._lookup_indices(self._user_lookup, user_ids)
+
+    def _movie_indices(self, movie_ids):
+        """movie_to_idx for an array of ids, in one vectorized lookup."""
+        if self._movie_lookup is None:
+            self._movie_lookup = pd.Series(self.movie_to_idx, dtype=np.int64)
+        return self._lookup_indices(self._movie_lookup, movie_ids)
 
     def predict(self, user_id, movie_id):
         """Predict rating for a (user, movie) pair."""
-        u_known = user_id in self.user_to_idx
-        m_known = movie_id in self.movie_to_idx
+        u = self.user_to_idx.get(user_id)
+        i = self.movie_to_idx.get(movie_id)
+        u_known = u is not None
+        m_known = i is not None
 
         if self.method == 'sgd':
             if u_known and m_known:
-                u = self.user_to_idx[user_id]
-                i = self.movie_to_idx[movie_id]
-                pred = self.global_mean + self.bu[u] + self.bi[i] + np.dot(self.P[u], self.Q[i])
+                # The hot path: bias + dot product + clip in a single call
+                return _predict_sgd(self.global_mean, self.bu, self.bi, self.P, self.Q, u, i)
             elif u_known:
-                u = self.user_to_idx[user_id]
                 pred = self.global_mean + self.bu[u]
             elif m_known:
-                i = self.movie_to_idx[movie_id]
                 pred = self.global_mean + self.bi[i]
             else:
                 pred = self.global_mean
         else:
             # SVD method
             if u_known and m_known:
-                u = self.user_to_idx[user_id]
-                i = self.movie_to_idx[movie_id]
-                pred = self.rating_matrix_mean[u] + np.dot(
-                    np.dot(self.user_factors[u], self.sigma),
-                    self.item_factors[:, i]
-                )
+                pred = self.rating_matrix_mean[u] + np.dot(self.US[u], self.item_factors[:, i])
             elif u_known:
-                pred = self.rating_matrix_mean[self.user_to_idx[user_id]]
+                pred = self.rating_matrix_mean[u]
             else:
                 pred = self.global_mean
 
-        return float(np.clip(pred, 0.5, 5.0))
+        # Builtin min/max: np.clip on a scalar costs more than the prediction itself
+        return float(min(max(pred, 0.5), 5.0))
 
     def predict_batch(self, user_id, movie_ids):
         """Predict ratings for a user on multiple movies."""
         return {mid: self.predict(user_id, mid) for mid in movie_ids}
 
+    def predict_many(self, user_id, movie_ids):
+        """
+        Vectorized predict() for one user over an array of movie ids.
+        Returns a float array aligned with movie_ids.
+        """
+        movie_ids = np.asarray(movie_ids)
+        idx = self._movie_indices(movie_ids)
+        known = idx >= 0
+        u = self.user_to_idx.get(user_id)
+
+        if self.method == 'sgd':
+            preds = np.full(len(movie_ids), self.global_mean, dtype=np.float64)
+            if u is not None:
+                preds += self.bu[u]
+            preds[known] += self.bi[idx[known]]
+            if u is not None:
+                preds[known] += self.Q[idx[known]] @ self.P[u]
+        else:
+            # SVD method
+            if u is not None:
+                preds = np.full(len(movie_ids), self.rating_matrix_mean[u], dtype=np.float64)
+                preds[known] += self.US[u] @ self.item_factors[:, idx[known]]
+            else:
+                preds = np.full(len(movie_ids), self.global_mean, dtype=np.float64)
+
+        return np.clip(preds, 0.5, 5.0)
+
+    def predict_matrix(self, user_ids, movie_ids):
+        """
+        Vectorized predict() for every (user, movie) pair, with one matrix
+        product over the known users and movies.
+        Returns a (len(user_ids), len(movie_ids)) float array.
+        """
+        u_idx = self._user_indices(user_ids)
+        i_idx = self._movie_indices(movie_ids)
+        u_known = u_idx >= 0
+        i_known = i_idx >= 0
+        known_block = np.ix_(u_known, i_known)
+
+        preds = np.full((len(u_idx), len(i_idx)), self.global_mean, dtype=np.float64)
+        if self.method == 'sgd':
+            preds[u_known] += self.bu[u_idx[u_known]][:, None]
+            preds[:, i_known] += self.bi[i_idx[i_known]]
+            preds[known_block] += self.P[u_idx[u_known]] @ self.Q[i_idx[i_known]].T
+        else:
+            # SVD method
+            preds[u_known] = self.rating_matrix_mean[u_idx[u_known]][:, None]
+            preds[known_block] += self.US[u_idx[u_known]] @ self.item_factors[:, i_idx[i_known]]
+
+        return np.clip(preds, 0.5, 5.0)
+
+    def predict_pairs(self, user_ids, movie_ids):
+        """
+        Vectorized predict() for aligned arrays of (user, movie) pairs, with the
+        same cold-start fallbacks. Returns a float array with one prediction per pair.
+        """
+        u_idx = self._user_indices(user_ids)
+        i_idx = self._movie_indices(movie_ids)
+        u_known = u_idx >= 0
+        i_known = i_idx >= 0
+        both = u_known & i_known
+
+        preds = np.full(len(u_idx), self.global_mean, dtype=np.float64)
+        if self.method == 'sgd':
+            preds[u_known] += self.bu[u_idx[u_known]]
+            preds[i_known] += self.bi[i_idx[i_known]]
+            preds[both] += np.einsum('ij,ij->i', self.P[u_idx[both]], self.Q[i_idx[both]])
+        else:
+            # SVD method
+            preds[u_known] = self.rating_matrix_mean[u_idx[u_known]]
+            preds[both] += np.einsum('ij,ji->i', self.US[u_idx[both]], self.item_factors[:, i_idx[both]])
+
+        return np.clip(preds, 0.5, 5.0)
+
     def evaluate(self, test_df):
         """Evaluate the model on test data, return RMSE + MAE."""
         print("  Evaluating on test set...")
-        predictions = []
-        actuals = []
-
-        for _, row in test_df.iterrows():
-            pred = self.predict(int(row['userId']), int(row['movieId']))
-            predictions.append(pred)
-            actuals.append(row['rating'])
-
-        predictions = np.array(predictions)
-        actuals = np.array(actuals)
+        predictions = self.predict_pairs(test_df['userId'].to_numpy(), test_df['movieId'].to_numpy())
+        actuals = test_df['rating'].to_numpy(dtype=np.float64)
 
         rmse = np.sqrt(np.mean((predictions - actuals) ** 2))
         mae = np.mean(np.abs(predictions - actuals))
@@ -212,12 +452,26 @@ class CFModelSVD:
     def get_top_n_for_user(self, user_id, all_movie_ids, rated_movie_ids, n=10):
         """Get top-N recommendations for a user (excluding already rated)."""
         candidates = [mid for mid in all_movie_ids if mid not in rated_movie_ids]
-        scores = [(mid, self.predict(user_id, mid)) for mid in candidates]
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:n]
+        if not candidates:
+            return []
+        scores = self.predict_many(user_id, candidates)
+        return [(candidates[p], float(scores[p])) for p in top_n_positions(scores, n)]
+
+    @staticmethod
+    def _array_path(path, name):
+        """Sidecar .npy file for one parameter array, next to the pickle."""
+        return f"{os.path.splitext(path)[0]}.{name}.npy"
 
     def save_model(self, path='src/models/saved/svd_model.pkl'):
+        """
+        Pickle the mappings and hyperparameters; write each parameter array to
+        its own .npy file so load_model() can memory-map it.
+        """
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self.ARRAY_ATTRS}
+        arrays = {name: arr for name, arr in arrays.items() if arr is not None}
+        for name, arr in arrays.items():
+            np.save(self._array_path(path, name), arr)
         state = {
             'method': self.method,
             'n_factors': self.n_factors,
@@ -226,12 +480,7 @@ class CFModelSVD:
             'idx_to_user': self.idx_to_user,
             'movie_to_idx': self.movie_to_idx,
             'idx_to_movie': self.idx_to_movie,
-            'P': self.P, 'Q': self.Q,
-            'bu': self.bu, 'bi': self.bi,
-            'user_factors': self.user_factors,
-            'sigma': self.sigma,
-            'item_factors': self.item_factors,
-            'rating_matrix_mean': self.rating_matrix_mean,
+            'arrays': list(arrays),
         }
         with open(path, 'wb') as f:
             pickle.dump(state, f)
@@ -247,14 +496,22 @@ class CFModelSVD:
         self.idx_to_user = state['idx_to_user']
         self.movie_to_idx = state['movie_to_idx']
         self.idx_to_movie = state['idx_to_movie']
-        self.P = state['P']
-        self.Q = state['Q']
-        self.bu = state['bu']
-        self.bi = state['bi']
-        self.user_factors = state['user_factors']
-        self.sigma = state['sigma']
-        self.item_factors = state['item_factors']
-        self.rating_matrix_mean = state['rating_matrix_mean']
+        self._user_lookup = self._movie_lookup = None
+        if 'arrays' in state:
+            # Read-only memory maps: pages load on first touch and are shared
+            # between processes forked after loading
+            for name in self.ARRAY_ATTRS:
+                arr = None
+                if name in state['arrays']:
+                    arr = np.load(self._array_path(path, name), mmap_mode='r')
+                setattr(self, name, arr)
+        else:
+            # Older pickles hold the arrays inline
+            for name in self.ARRAY_ATTRS:
+                setattr(self, name, state.get(name))
+        if self.US is None and self.user_factors is not None:
+            # Pickles from before US was stored (sigma saved as a diagonal matrix)
+            self.US = np.dot(self.user_factors, self.sigma)
         print(f"  Model loaded from {path}")
 
 
@@ -264,13 +521,14 @@ if __name__ == "__main__":
     import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
     from config import get_processed_file_path
+    from src.data_store import read_processed
     
     print("=" * 60)
     print("ReelSense++ - SVD Collaborative Filtering")
     print("=" * 60)
 
-    train_df = pd.read_csv(get_processed_file_path('train_ratings.csv'))
-    test_df = pd.read_csv(get_processed_file_path('test_ratings.csv'))
+    train_df = read_processed(get_processed_file_path('train_ratings.csv'))
+    test_df = read_processed(get_processed_file_path('test_ratings.csv'))
 
     print(f"\nDataset: {len(train_df):,} train / {len(test_df):,} test ratings")
 
@@ -9,39 +9,63 @@ class DiversityOptimizer:
     def __init__(self, hybrid_recommender):
         self.hybrid = hybrid_recommender
 
-    def mmr_rerank(self, user_id, candidates, top_k=10, lambda_param=0.5):
+    def mmr_rerank(self, user_id, candidates, top_k=10, lambda_param=0.5, sim_matrix=None):
         """
         Maximal Marginal Relevance (MMR) for diversity optimization.
         candidates: List of (movie_id, score, cf_score, content_score)
+        sim_matrix: optional content similarities between candidates (row/col i =
+            candidates[i]); built here in one call when the recommender has a
+            content model, else pairs are looked up one at a time
         """
         if not candidates:
             return []
+        if sim_matrix is None and hasattr(self.hybrid, 'content_model'):
+            sim_matrix = self.hybrid.content_model.similarity_matrix([cand[0] for cand in candidates])
+        if sim_matrix is not None:
+            return self._mmr_rerank_matrix(candidates, sim_matrix, top_k, lambda_param)
 
         selected_ids = []
         remaining_candidates = sorted(candidates, key=lambda x: x[1], reverse=True)
+        relevance = np.array([cand[1] for cand in remaining_candidates], dtype=np.float64)
 
         # Select the first (highest scoring) candidate
         best_first = remaining_candidates.pop(0)
+        relevance = relevance[1:]
         selected_ids.append(best_first)
+        # Max similarity of each remaining candidate to the selected items (floored
+        # at 0), updated with only the newest selection each round
+        max_sim = np.zeros(len(remaining_candidates))
 
         while len(selected_ids) < top_k and remaining_candidates:
-            mmr_scores = []
-            for cand in remaining_candidates:
-                m_id = cand[0]
-                rel_score = cand[1]
-
-                # Max similarity to already selected items
-                max_sim = 0
-                for sel in selected_ids:
-                    sim = self.hybrid.get_content_similarity(m_id, sel[0])
-                    if sim > max_sim:
-                        max_sim = sim
-
-                # MMR: lambda * Relevance - (1 - lambda) * MaxSimilarity
-                mmr_val = lambda_param * rel_score - (1 - lambda_param) * max_sim
-                mmr_scores.append(mmr_val)
+            newest = selected_ids[-1][0]
+            sims = np.fromiter((self.hybrid.get_content_similarity(cand[0], newest)
+                                for cand in remaining_candidates),
+                               dtype=np.float64, count=len(remaining_candidates))
+            np.fmax(max_sim, sims, out=max_sim)  # fmax: NaN similarities are skipped, as before
 
+            # MMR: lambda * Relevance - (1 - lambda) * MaxSimilarity
+            mmr_scores = lambda_param * relevance - (1 - lambda_param) * max_sim
             best_idx = int(np.argmax(mmr_scores))
             selected_ids.append(remaining_candidates.pop(best_idx))
+            relevance = np.delete(relevance, best_idx)
+            max_sim = np.delete(max_sim, best_idx)
 
         return selected_ids
+
+    def _mmr_rerank_matrix(self, candidates, sim_matrix, top_k, lambda_param):
+        """mmr_rerank() on a precomputed similarity matrix, tracking max similarity incrementally."""
+        relevance = np.array([cand[1] for cand in candidates], dtype=np.float64)
+        remaining = sorted(range(len(candidates)), key=lambda i: candidates[i][1], reverse=True)
+
+        # Select the first (highest scoring) candidate
+        selected = [remaining.pop(0)]
+        max_sim = np.maximum(sim_matrix[:, selected[0]], 0)
+
+        while len(selected) < top_k and remaining:
+            # MMR: lambda * Relevance - (1 - lambda) * MaxSimilarity
+            mmr_scores = lambda_param * relevance[remaining] - (1 - lambda_param) * max_sim[remaining]
+            best = remaining.pop(int(np.argmax(mmr_scores)))
+            selected.append(best)
+            max_sim = np.maximum(max_sim, sim_matrix[:, best])
+
+        return [candidates[i] for i in selected]
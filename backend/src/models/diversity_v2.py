@@ -8,6 +8,8 @@ import pandas as pd
 from collections import Counter
 import re
 
+from models.genres import parse_genres
+
 class DiversityOptimizerV2:
     """
     Stage 3: Diversity-Optimized Re-ranking
@@ -66,7 +68,7 @@ class DiversityOptimizerV2:
         
         # Update diversity trackers
         movie_data = self.movies[self.movies['movieId'] == first['movieId']].iloc[0]
-        genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+        genres = parse_genres(movie_data['genres'])
         for g in genres:
             genre_counts[g] += 1
         decade_counts[self.get_decade(first['movieId'])] += 1
@@ -83,7 +85,7 @@ class DiversityOptimizerV2:
                 
                 # Get movie metadata
                 movie_data = self.movies[self.movies['movieId'] == movie_id].iloc[0]
-                genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+                genres = parse_genres(movie_data['genres'])
                 decade = self.get_decade(movie_id)
                 
                 # Check diversity constraints
@@ -126,7 +128,7 @@ class DiversityOptimizerV2:
             
             # Update diversity trackers
             movie_data = self.movies[self.movies['movieId'] == best_cand['movieId']].iloc[0]
-            genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+            genres = parse_genres(movie_data['genres'])
             for g in genres:
                 genre_counts[g] += 1
             decade_counts[self.get_decade(best_cand['movieId'])] += 1
@@ -144,7 +146,7 @@ class DiversityOptimizerV2:
                 # Find a high-quality movie from unexplored genre
                 for cand in remaining[:20]:
                     movie_data = self.movies[self.movies['movieId'] == cand['movieId']].iloc[0]
-                    genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+                    genres = parse_genres(movie_data['genres'])
                     if any(g in unexplored_genres for g in genres):
                         # Replace last item with serendipity pick
                         selected[-1] = cand
@@ -164,7 +166,7 @@ class DiversityOptimizerV2:
         for rec in recommendations:
             movie_id = rec['movieId']
             movie_data = self.movies[self.movies['movieId'] == movie_id].iloc[0]
-            genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+            genres = parse_genres(movie_data['genres'])
             all_genres.extend(genres)
             decades.add(self.get_decade(movie_id))
             if self.is_long_tail(movie_id):
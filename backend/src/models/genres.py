@@ -0,0 +1,39 @@
+"""
+Genre parsing shared by the v2 pipeline.
+Stored genre lists are parsed once per distinct string instead of eval()'d on
+every lookup.
+"""
+import ast
+import json
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # fall back to json
+
+
+@lru_cache(maxsize=4096)
+def _parse_genre_string(genres):
+    # JSON lists (written by preprocessing) first, then Python list literals
+    # from older files, then plain 'A|B|C' strings
+    try:
+        parsed = orjson.loads(genres) if orjson is not None else json.loads(genres)
+    except ValueError:
+        try:
+            parsed = ast.literal_eval(genres)
+        except (ValueError, SyntaxError):
+            parsed = genres.split('|')
+    if not isinstance(parsed, (list, tuple)):
+        parsed = genres.split('|')  # a bare scalar such as '"Drama"'
+    return tuple(parsed)
+
+
+def parse_genres(genres):
+    """
+    Genres of a movie as a tuple. Strings are parsed (and cached); anything
+    else, e.g. a list already loaded from Parquet, is returned as is.
+    """
+    if isinstance(genres, str):
+        return _parse_genre_string(genres)
+    return genres
@@ -5,7 +5,7 @@ into a unified recommender with the recommend_movies() function.
 """
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 from sklearn.feature_extraction.text import TfidfVectorizer
 import time
 import os
@@ -15,6 +15,8 @@ import pickle
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from config import PROCESSED_DATA_DIR, MODEL_DIR
+from src.data_store import read_processed
+from src.models.cf_model import top_n_positions
 
 
 class ContentBasedModel:
@@ -23,6 +25,7 @@ class ContentBasedModel:
     def __init__(self):
         self.tfidf = TfidfVectorizer(stop_words='english', max_features=5000)
         self.content_matrix = None
+        self.content_matrix_t = None  # transposed copy (CSR), for one-row-vs-all products
         self.movie_id_to_idx = {}
         self.idx_to_movie_id = {}
 
@@ -39,8 +42,9 @@ class ContentBasedModel:
         self.movie_id_to_idx = {mid: i for i, mid in enumerate(movies_df['movieId'].values)}
         self.idx_to_movie_id = {i: mid for mid, i in self.movie_id_to_idx.items()}
 
-        # Fit TF-IDF
-        self.content_matrix = self.tfidf.fit_transform(movies_df['content'].fillna(''))
+        # Fit TF-IDF; rows are L2-normalized once so cosine similarity is a plain dot product
+        self.content_matrix = normalize(self.tfidf.fit_transform(movies_df['content'].fillna('')), copy=False)
+        self.content_matrix_t = self.content_matrix.T.tocsr()
         print(f"  Content-based model: {self.content_matrix.shape[0]} movies, "
               f"{self.content_matrix.shape[1]} features")
 
@@ -50,34 +54,44 @@ class ContentBasedModel:
             return 0.0
         idx1 = self.movie_id_to_idx[movie_id1]
         idx2 = self.movie_id_to_idx[movie_id2]
-        sim = cosine_similarity(
-            self.content_matrix[idx1:idx1+1],
-            self.content_matrix[idx2:idx2+1]
-        )
-        return float(sim[0][0])
+        sim = self.content_matrix[idx1:idx1+1] @ self.content_matrix[idx2:idx2+1].T
+        return float(sim[0, 0])
+
+    def similarity_matrix(self, movie_ids):
+        """Pairwise cosine similarities of movie_ids in one call (0 for unknown movies)."""
+        idx = np.array([self.movie_id_to_idx.get(mid, -1) for mid in movie_ids], dtype=np.int64)
+        known = idx >= 0
+        rows = self.content_matrix[np.where(known, idx, 0)]
+        sims = (rows @ rows.T).toarray()
+        sims[~known, :] = 0.0
+        sims[:, ~known] = 0.0
+        return sims
 
     def get_similar_movies(self, movie_id, n=10):
         """Find n most similar movies by content."""
         if movie_id not in self.movie_id_to_idx:
             return []
         idx = self.movie_id_to_idx[movie_id]
-        sims = cosine_similarity(self.content_matrix[idx:idx+1], self.content_matrix).flatten()
+        sims = (self.content_matrix[idx:idx+1] @ self.content_matrix_t).toarray().ravel()
         similar_indices = sims.argsort()[::-1][1:n+1]  # Skip self
         return [(self.idx_to_movie_id[i], float(sims[i])) for i in similar_indices]
 
-    def get_user_content_score(self, user_id, movie_id, train_ratings, top_k=10):
+    def get_user_content_score(self, user_id, movie_id, train_ratings, top_k=10, top_movies=None):
         """
         Content score: avg similarity of candidate movie to user's top-rated movies.
+        top_movies: the user's top-rated movie ids, if already known (skips the
+        train_ratings scan).
         """
         if movie_id not in self.movie_id_to_idx:
             return 0.0
 
-        user_ratings = train_ratings[train_ratings['userId'] == user_id]
-        if user_ratings.empty:
-            return 0.0
+        if top_movies is None:
+            user_ratings = train_ratings[train_ratings['userId'] == user_id]
+            if user_ratings.empty:
+                return 0.0
 
-        # Get user's top-rated movies
-        top_movies = user_ratings.nlargest(top_k, 'rating')['movieId'].tolist()
+            # Get user's top-rated movies
+            top_movies = user_ratings.nlargest(top_k, 'rating')['movieId'].tolist()
 
         sims = []
         for rated_mid in top_movies:
@@ -86,6 +100,31 @@ class ContentBasedModel:
 
         return float(np.mean(sims)) if sims else 0.0
 
+    def get_user_content_scores(self, user_id, movie_ids, train_ratings, top_k=10, top_movies=None):
+        """
+        Vectorized get_user_content_score() over an array of candidate movies:
+        one similarity block against the user's top-rated movies.
+        """
+        scores = np.zeros(len(movie_ids))
+
+        if top_movies is None:
+            user_ratings = train_ratings[train_ratings['userId'] == user_id]
+            if user_ratings.empty:
+                return scores
+            top_movies = user_ratings.nlargest(top_k, 'rating')['movieId'].tolist()
+
+        top_idx = [self.movie_id_to_idx[m] for m in top_movies if m in self.movie_id_to_idx]
+        cand = [(pos, self.movie_id_to_idx[m]) for pos, m in enumerate(movie_ids)
+                if m in self.movie_id_to_idx]
+        if not top_idx or not cand:
+            return scores
+
+        # Unknown top movies count as zero similarity, as in the scalar version
+        positions, rows = zip(*cand)
+        sims = (self.content_matrix[list(rows)] @ self.content_matrix[top_idx].T).toarray()
+        scores[list(positions)] = sims.sum(axis=1) / len(top_movies)
+        return scores
+
     def save(self, path='src/models/saved/content_model.pkl'):
         os.makedirs(os.path.dirname(path), exist_ok=True)
         state = {
@@ -101,7 +140,10 @@ class ContentBasedModel:
         with open(path, 'rb') as f:
             state = pickle.load(f)
         self.tfidf = state['tfidf']
-        self.content_matrix = state['content_matrix']
+        # Normalizing is a no-op for the vectorizer's default L2 output, but
+        # similarities rely on unit rows
+        self.content_matrix = normalize(state['content_matrix'], copy=False)
+        self.content_matrix_t = self.content_matrix.T.tocsr()
         self.movie_id_to_idx = state['movie_id_to_idx']
         self.idx_to_movie_id = state['idx_to_movie_id']
 
@@ -120,55 +162,126 @@ class HybridRecommender:
         self.train_ratings = train_ratings
         self.movies_df = movies_df
 
-        # Build fast lookup sets
+        # Build fast lookup sets, plus each user's (movieIds, ratings) arrays in
+        # train_ratings order so per-user queries need no DataFrame scan
         self.all_movie_ids = set(movies_df['movieId'].tolist())
         self.user_rated = {}
+        self.user_ratings = {}
         for uid, group in train_ratings.groupby('userId'):
-            self.user_rated[uid] = set(group['movieId'].tolist())
-
-        # Movie info lookup
-        self.movie_info = {}
-        for _, row in movies_df.iterrows():
-            mid = row['movieId']
-            self.movie_info[mid] = {
-                'title': row.get('title', f'Movie {mid}'),
-                'genres': row.get('genres', ''),
-                'year': row.get('year', None),
-                'avg_rating': row.get('avg_rating', 0),
-                'num_ratings': row.get('num_ratings', 0),
-            }
+            movie_ids = group['movieId'].to_numpy()
+            self.user_rated[uid] = set(movie_ids.tolist())
+            self.user_ratings[uid] = (movie_ids, group['rating'].to_numpy())
+
+        # Most-rated first (ties in movies_df order), the order recommend()'s
+        # nlargest() candidate pool is drawn in
+        self.popularity_order = movies_df.dropna(subset=['num_ratings']).sort_values(
+            'num_ratings', ascending=False, kind='stable'
+        )['movieId'].tolist()
+
+        # Movie info lookup, built from whole columns (missing columns get defaults)
+        movie_ids = movies_df['movieId'].tolist()
+        n_movies = len(movie_ids)
+
+        def column(name, default):
+            return movies_df[name].tolist() if name in movies_df.columns else [default] * n_movies
+
+        if 'title' in movies_df.columns:
+            titles = movies_df['title'].tolist()
+        else:
+            titles = [f'Movie {mid}' for mid in movie_ids]
+        self.movie_info = {
+            mid: {'title': title, 'genres': genres, 'year': year,
+                  'avg_rating': avg_rating, 'num_ratings': num_ratings}
+            for mid, title, genres, year, avg_rating, num_ratings in zip(
+                movie_ids, titles, column('genres', ''), column('year', None),
+                column('avg_rating', 0), column('num_ratings', 0))
+        }
+        # Each movie's genres split once, for explain()'s overlap checks
+        self.movie_genres_set = {
+            mid: frozenset(info['genres'].split('|')) if isinstance(info['genres'], str) else frozenset()
+            for mid, info in self.movie_info.items()
+        }
+
+    def user_top_movies(self, user_id, k):
+        """The user's k top-rated movie ids, in train_ratings.nlargest(k, 'rating') order."""
+        if user_id not in self.user_ratings:
+            return []
+        movie_ids, ratings = self.user_ratings[user_id]
+        # Stable, so ties keep train_ratings order like nlargest(keep='first')
+        return movie_ids[np.argsort(-ratings, kind='stable')[:k]].tolist()
+
+    def _candidate_pool(self, rated, candidate_pool):
+        """
+        Movies to score for a user: all unrated movies, or the candidate_pool
+        most-rated of them when there are more (biased towards popular movies).
+        """
+        n_unrated = len(self.all_movie_ids) - len(self.all_movie_ids.intersection(rated))
+        if n_unrated <= candidate_pool:
+            return [mid for mid in self.all_movie_ids if mid not in rated]
+
+        pool = []
+        for mid in self.popularity_order:
+            if mid not in rated:
+                pool.append(mid)
+                if len(pool) == candidate_pool:
+                    break
+        return pool
 
     def recommend(self, user_id, top_k=10, cf_weight=0.7, candidate_pool=500):
         """
-        Core recommendation with hybrid scoring.
+        Core recommendation with hybrid scoring. CF and content scores for the
+        whole candidate pool are computed in one vectorized pass each.
         Returns list of (movie_id, final_score, cf_score, content_score).
         """
-        rated = self.user_rated.get(user_id, set())
-        candidates = [mid for mid in self.all_movie_ids if mid not in rated]
-
-        # Pre-filter: get CF scores for a larger pool first
-        # For efficiency, sample candidates if too many
-        if len(candidates) > candidate_pool:
-            # Bias towards popular movies
-            popular = self.movies_df[
-                self.movies_df['movieId'].isin(candidates)
-            ].nlargest(candidate_pool, 'num_ratings')['movieId'].tolist()
-            candidates = popular
+        candidates = self._candidate_pool(self.user_rated.get(user_id, set()), candidate_pool)
+        if not candidates:
+            return []
 
-        results = []
-        for mid in candidates:
-            cf_score = self.cf_model.predict(user_id, mid)
-            cf_norm = (cf_score - 0.5) / 4.5  # Normalize 0.5-5.0 → 0-1
+        cf_scores = self.cf_model.predict_many(user_id, candidates)
+        content_scores = self.content_model.get_user_content_scores(
+            user_id, candidates, self.train_ratings, top_movies=self.user_top_movies(user_id, 5)
+        )
+        # CF normalized 0.5-5.0 → 0-1
+        final_scores = cf_weight * ((cf_scores - 0.5) / 4.5) + (1 - cf_weight) * content_scores
 
-            content_score = self.content_model.get_user_content_score(
-                user_id, mid, self.train_ratings, top_k=5
-            )
+        # Ties keep candidate order
+        top = top_n_positions(final_scores, top_k)
+        return [
+            (candidates[i], float(final_scores[i]), float(cf_scores[i]), float(content_scores[i]))
+            for i in top
+        ]
 
-            final_score = cf_weight * cf_norm + (1 - cf_weight) * content_score
-            results.append((mid, final_score, cf_score, content_score))
+    def recommend_batch(self, user_ids, top_k=10, cf_weight=0.7, candidate_pool=500):
+        """
+        recommend() for many users at once. CF scores for the union of all
+        candidate pools come from a single (users x candidates) matrix product.
+        Returns one recommend()-style list per user.
+        """
+        pools = [self._candidate_pool(self.user_rated.get(uid, set()), candidate_pool)
+                 for uid in user_ids]
+
+        union = sorted(set().union(*pools))
+        column = {mid: j for j, mid in enumerate(union)}
+        cf_matrix = self.cf_model.predict_matrix(user_ids, union)
+
+        batch = []
+        for row, (uid, pool) in enumerate(zip(user_ids, pools)):
+            if not pool:
+                batch.append([])
+                continue
+            cf_scores = cf_matrix[row, [column[mid] for mid in pool]]
+            content_scores = self.content_model.get_user_content_scores(
+                uid, pool, self.train_ratings, top_movies=self.user_top_movies(uid, 5)
+            )
+            final_scores = cf_weight * ((cf_scores - 0.5) / 4.5) + (1 - cf_weight) * content_scores
 
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+            # Ties keep candidate order exactly like recommend()
+            top = top_n_positions(final_scores, top_k)
+            batch.append([
+                (pool[i], float(final_scores[i]), float(cf_scores[i]), float(content_scores[i]))
+                for i in top
+            ])
+        return batch
 
     def recommend_movies(self, user_id, top_n=10, cf_weight=0.7):
         """
@@ -180,7 +293,7 @@ class HybridRecommender:
         results = []
         for movie_id, final_score, cf_score, content_score in recs:
             info = self.movie_info.get(movie_id, {})
-            explanation = self.explain(user_id, movie_id)
+            explanation = self.explain(user_id, movie_id, cf_score, content_score)
 
             confidence = min(1.0, final_score * 1.1)  # Normalized confidence
             why_not = self._generate_why_not(user_id, movie_id, cf_score)
@@ -203,45 +316,48 @@ class HybridRecommender:
 
         return results
 
-    def explain(self, user_id, movie_id):
-        """Generate multi-level explanations for a recommendation."""
+    def explain(self, user_id, movie_id, cf_score=None, content_score=None):
+        """
+        Generate multi-level explanations for a recommendation.
+        cf_score/content_score: scores the caller already computed; predicted here if None.
+        """
         info = self.movie_info.get(movie_id, {})
         title = info.get('title', f'Movie {movie_id}')
-        genres = info.get('genres', '')
 
         # Find overlapping genres with user's favorites
-        user_ratings = self.train_ratings[self.train_ratings['userId'] == user_id]
-        if user_ratings.empty:
+        if user_id not in self.user_ratings:
             return {
                 'simple': f"'{title}' is a popular movie you might enjoy.",
                 'intermediate': f"Based on overall popularity and content features.",
                 'advanced': f"Cold-start recommendation using global popularity bias."
             }
 
-        user_top = user_ratings.nlargest(5, 'rating').merge(
-            self.movies_df[['movieId', 'title', 'genres']], on='movieId'
-        )
+        # The user's top 10 (the content score's profile); the first 5 feed the genre match
+        top_movies = self.user_top_movies(user_id, 10)
 
         # Find genre overlap
-        movie_genres = set(genres.split('|')) if isinstance(genres, str) else set()
+        movie_genres = self.movie_genres_set.get(movie_id, frozenset())
         matched_movie = None
         overlap_genres = set()
 
-        for _, row in user_top.iterrows():
-            past_genres = set(str(row['genres']).split('|'))
-            overlap = movie_genres & past_genres
+        for mid in top_movies[:5]:
+            if mid not in self.movie_info:
+                continue
+            overlap = movie_genres & self.movie_genres_set[mid]
             if overlap and not matched_movie:
-                matched_movie = row['title']
+                matched_movie = self.movie_info[mid]['title']
                 overlap_genres = overlap
 
-        cf_score = self.cf_model.predict(user_id, movie_id)
-        content_score = self.content_model.get_user_content_score(
-            user_id, movie_id, self.train_ratings
-        )
+        if cf_score is None:
+            cf_score = self.cf_model.predict(user_id, movie_id)
+        if content_score is None:
+            content_score = self.content_model.get_user_content_score(
+                user_id, movie_id, self.train_ratings, top_movies=top_movies
+            )
 
         if matched_movie and overlap_genres:
             simple = f"Because you liked '{matched_movie}', we think you'll enjoy '{title}'."
-            intermediate = (f"'{title}' shares the genre(s) {', '.join(list(overlap_genres)[:3])} "
+            intermediate = (f"'{title}' shares the genre(s) {', '.join(sorted(overlap_genres)[:3])} "
                           f"with movies you rated highly. Similar users also rated it well.")
         else:
             simple = f"'{title}' is recommended based on your viewing pattern."
@@ -305,9 +421,9 @@ def build_hybrid_system(data_dir=None, model_dir=None):
 
     # Load preprocessed data
     print("\n[1/4] Loading preprocessed data...")
-    train_df = pd.read_csv(os.path.join(data_dir, 'train_ratings.csv'))
-    movies_df = pd.read_csv(os.path.join(data_dir, 'movies_cleaned.csv'))
-    tags_df = pd.read_csv(os.path.join(data_dir, 'tags_cleaned.csv'))
+    train_df = read_processed(os.path.join(data_dir, 'train_ratings.csv'))
+    movies_df = read_processed(os.path.join(data_dir, 'movies_cleaned.csv'))
+    tags_df = read_processed(os.path.join(data_dir, 'tags_cleaned.csv'))
     print(f"  Train: {len(train_df):,} | Movies: {len(movies_df):,} | Tags: {len(tags_df):,}")
 
     # Train CF model
@@ -343,8 +459,8 @@ def load_hybrid_system(data_dir=None, model_dir=None):
     print(f"  Data dir: {data_dir}")
     print(f"  Model dir: {model_dir}")
 
-    train_df = pd.read_csv(os.path.join(data_dir, 'train_ratings.csv'))
-    movies_df = pd.read_csv(os.path.join(data_dir, 'movies_cleaned.csv'))
+    train_df = read_processed(os.path.join(data_dir, 'train_ratings.csv'))
+    movies_df = read_processed(os.path.join(data_dir, 'movies_cleaned.csv'))
 
     from src.models.cf_model import CFModelSVD
     cf = CFModelSVD()
@@ -13,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from models.svdpp_model import SVDPlusPlusModel
 from models.bert_embeddings import BERTMovieEmbedder
 from models.user_modeling import DynamicUserProfiler, ContextEngine
+from models.genres import parse_genres
 
 class HybridRecommenderV2:
     """
@@ -28,6 +29,25 @@ class HybridRecommenderV2:
         self.movies = movies
         self.tags = tags
         
+        # Movie metadata by row: movieId -> row (first occurrence, as the old
+        # boolean-mask .iloc[0] lookups), with titles and parsed genres
+        movie_ids = movies['movieId'].tolist()
+        self.movie_idx = dict(zip(reversed(movie_ids), range(len(movie_ids) - 1, -1, -1)))
+        self.titles_arr = movies['title'].tolist()
+        self.genres_arr = [parse_genres(g) for g in movies['genres'].tolist()]
+        
+        # Per-user lookups, built once: rated movies, and the top 5 by rating
+        # (stable sort, so ties keep train_ratings order); catalog ids as an array
+        self.all_movie_ids = movies['movieId'].to_numpy(dtype=np.int64)
+        self.user_rated = train_ratings.groupby('userId')['movieId'].apply(set).to_dict()
+        self.user_top5 = (
+            train_ratings.sort_values('rating', ascending=False, kind='stable')
+            .groupby('userId').head(5)
+            .groupby('userId')['movieId'].apply(list).to_dict()
+        )
+        
+        self._rng = np.random.default_rng()  # candidate downsampling
+        
         # Initialize user profiler and context engine
         self.profiler = DynamicUserProfiler(train_ratings, movies)
         self.context_engine = ContextEngine()
@@ -38,45 +58,44 @@ class HybridRecommenderV2:
         Returns top-200 candidates with hybrid scores.
         """
         # Get user's rated movies
-        rated_movies = self.train_ratings[self.train_ratings['userId'] == user_id]['movieId'].tolist()
-        all_movies = self.movies['movieId'].tolist()
-        candidates = [m for m in all_movies if m not in rated_movies]
+        rated_movies = self.user_rated.get(user_id, set())
+        rated_arr = np.fromiter(rated_movies, dtype=np.int64, count=len(rated_movies))
+        candidates = self.all_movie_ids[~np.isin(self.all_movie_ids, rated_arr)]
         
         # Limit for computational efficiency
-        import random
         if len(candidates) > 2000:
-            candidates = random.sample(candidates, 2000)
+            candidates = self._rng.choice(candidates, 2000, replace=False)
+        candidates = candidates.tolist()
         
-        scores = []
         user_profile = self.profiler.get_profile(user_id)
         
-        for movie_id in candidates:
-            # CF score from SVD++
-            cf_score = self.svdpp.predict(user_id, movie_id)
-            cf_norm = (cf_score - 0.5) / 4.5  # Normalize to [0, 1]
-            
-            # Content score from BERT
-            # Find user's top-rated movies
-            user_top = self.train_ratings[
-                self.train_ratings['userId'] == user_id
-            ].sort_values('rating', ascending=False).head(5)['movieId'].tolist()
-            
-            content_sims = []
-            for top_movie in user_top:
-                sim = self.bert.compute_similarity(movie_id, top_movie)
-                content_sims.append(sim)
-            
-            content_score = np.mean(content_sims) if content_sims else 0
-            
-            # Hybrid score
-            hybrid_score = (cf_weight * cf_norm) + ((1 - cf_weight) * content_score)
-            
-            scores.append({
+        # CF score from SVD++, one batched call for all candidates
+        cf_scores = self.svdpp.predict_batch(user_id, candidates)
+        cf_norm = (cf_scores - 0.5) / 4.5  # Normalize to [0, 1]
+        
+        # Content score from BERT: mean cosine similarity to the user's top-rated
+        # movies, for all candidates in one matrix product
+        user_top = self.user_top5.get(user_id, [])
+        if user_top:
+            candidate_emb = self.bert.get_embeddings(candidates)
+            top_emb = self.bert.get_embeddings(user_top)
+            content_scores = (candidate_emb @ top_emb.T).mean(axis=1)
+        else:
+            content_scores = np.zeros(len(candidates))
+        
+        # Hybrid score
+        hybrid_scores = (cf_weight * cf_norm) + ((1 - cf_weight) * content_scores)
+        
+        scores = [
+            {
                 'movieId': movie_id,
                 'hybrid_score': hybrid_score,
                 'cf_score': cf_score,
                 'content_score': content_score
-            })
+            }
+            for movie_id, hybrid_score, cf_score, content_score
+            in zip(candidates, hybrid_scores.tolist(), cf_scores.tolist(), content_scores.tolist())
+        ]
         
         # Sort and return top-K candidates
         scores.sort(key=lambda x: x['hybrid_score'], reverse=True)
@@ -87,37 +106,24 @@ class HybridRecommenderV2:
         Stage 2: Context-Aware Personalization
         Adjusts candidate scores based on temporal and device context.
         """
-        personalized = []
+        # Context type and device are fixed for the call: look up their boosts
+        # once, then scale all candidate scores together
+        genre_boost = self.context_engine.build_genre_multiplier(context_type)
+        device_boost = self.context_engine.device_multiplier(device)
         
-        for cand in candidates:
-            movie_id = cand['movieId']
-            base_score = cand['hybrid_score']
-            
-            # Get movie metadata
-            movie_data = self.movies[self.movies['movieId'] == movie_id].iloc[0]
-            genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
-            
-            movie_metadata = {
-                'genres': genres,
-                'title': movie_data['title']
-            }
-            
-            # Apply context adjustment
-            adjusted_score = self.context_engine.adjust_score_by_context(
-                base_score, 
-                movie_metadata, 
-                context_type, 
-                device
-            )
-            
-            personalized.append({
-                **cand,
-                'personalized_score': adjusted_score
-            })
-        
-        # Re-sort by personalized score
-        personalized.sort(key=lambda x: x['personalized_score'], reverse=True)
-        return personalized
+        base_scores = np.array([cand['hybrid_score'] for cand in candidates], dtype=np.float64)
+        temporal = np.array([
+            max((genre_boost.get(g, 1.0) for g in self.genres_arr[self.movie_idx[cand['movieId']]]), default=1.0)
+            for cand in candidates
+        ], dtype=np.float64)
+        adjusted_scores = base_scores * temporal * device_boost
+        
+        # Re-sort by personalized score (stable, so ties keep candidate order)
+        order = np.argsort(-adjusted_scores, kind='stable')
+        return [
+            {**candidates[i], 'personalized_score': float(adjusted_scores[i])}
+            for i in order
+        ]
     
     def recommend(self, user_id, top_k=10, context_type='weekday_evening', device='desktop'):
         """
@@ -138,8 +144,9 @@ class HybridRecommenderV2:
         - intermediate: "Matches your preference for Y genre"
         - advanced: Confidence scores and similarity paths
         """
-        movie_title = self.movies[self.movies['movieId'] == movie_id]['title'].values[0]
-        movie_genres = eval(self.movies[self.movies['movieId'] == movie_id]['genres'].values[0])
+        i = self.movie_idx[movie_id]
+        movie_title = self.titles_arr[i]
+        movie_genres = self.genres_arr[i]
         
         user_history = self.train_ratings[self.train_ratings['userId'] == user_id].merge(
             self.movies, on='movieId'
@@ -148,11 +155,11 @@ class HybridRecommenderV2:
         
         if explanation_level == 'simple':
             # Find similar movie from history
-            for _, row in user_top.iterrows():
-                past_genres = eval(row['genres']) if isinstance(row['genres'], str) else row['genres']
+            for title, genres in zip(user_top['title'].tolist(), user_top['genres'].tolist()):
+                past_genres = parse_genres(genres)
                 overlap = set(movie_genres).intersection(set(past_genres))
                 if overlap:
-                    return f"Because you liked '{row['title']}', we recommend '{movie_title}'."
+                    return f"Because you liked '{title}', we recommend '{movie_title}'."
             return f"We recommend '{movie_title}' based on your viewing history."
         
         elif explanation_level == 'intermediate':
@@ -176,10 +183,7 @@ class HybridRecommenderV2:
             confidence = min((cf_score - 0.5) / 4.5, 1.0)
             
             similar_movies = self.bert.find_similar_movies(movie_id, top_k=3)
-            similar_titles = [
-                self.movies[self.movies['movieId'] == mid]['title'].values[0] 
-                for mid, _ in similar_movies
-            ]
+            similar_titles = [self.titles_arr[self.movie_idx[mid]] for mid, _ in similar_movies]
             
             return {
                 'title': movie_title,
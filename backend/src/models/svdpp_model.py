@@ -38,6 +38,7 @@ class SVDPlusPlusModel:
         )
         self.reader = Reader(rating_scale=(0.5, 5.0))
         self.trainset = None
+        self._user_vectors = {}  # inner uid -> pu + implicit feedback term, for predict_batch
         
     def fit(self, train_df):
         """
@@ -58,6 +59,7 @@ class SVDPlusPlusModel:
         )
         self.trainset = data.build_full_trainset()
         self.model.fit(self.trainset)
+        self._user_vectors = {}
         print("SVD++ training complete.")
         
     def predict(self, user_id, movie_id):
@@ -71,6 +73,49 @@ class SVDPlusPlusModel:
         pred = self.model.predict(user_id, movie_id)
         return pred.est
     
+    def predict_batch(self, user_id, movie_ids):
+        """
+        predict() for many movies at once. The user's vector (pu plus the
+        implicit feedback sum over their rated items) is built once and scored
+        against all known items in one matrix-vector product.
+        Returns a float array aligned with movie_ids.
+        """
+        if self.use_fallback:
+            return np.array([self.predict(user_id, mid) for mid in movie_ids], dtype=np.float64)
+
+        algo = self.model
+        trainset = algo.trainset
+        items = np.array([self._inner_iid(trainset, mid) for mid in movie_ids], dtype=np.int64)
+        known = items >= 0
+
+        # Same terms as surprise's SVDpp.estimate(), then predict()'s clipping
+        est = np.full(len(items), trainset.global_mean, dtype=np.float64)
+        est[known] += algo.bi[items[known]]
+        u = self._inner_uid(trainset, user_id)
+        if u >= 0:
+            est += algo.bu[u]
+            if u not in self._user_vectors:
+                rated = [j for (j, _) in trainset.ur[u]]
+                self._user_vectors[u] = algo.pu[u] + algo.yj[rated].sum(axis=0) / np.sqrt(len(rated))
+            est[known] += algo.qi[items[known]] @ self._user_vectors[u]
+
+        lower, upper = trainset.rating_scale
+        return np.clip(est, lower, upper)
+
+    @staticmethod
+    def _inner_uid(trainset, user_id):
+        try:
+            return trainset.to_inner_uid(user_id)
+        except ValueError:
+            return -1
+
+    @staticmethod
+    def _inner_iid(trainset, movie_id):
+        try:
+            return trainset.to_inner_iid(movie_id)
+        except ValueError:
+            return -1
+    
     def get_top_n_recommendations(self, user_id, n=10, candidate_movies=None):
         if self.use_fallback:
             # Fallback logic for top-N
@@ -104,6 +149,7 @@ class SVDPlusPlusModel:
         """Load pre-trained model."""
         with open(path, 'rb') as f:
             self.model = pickle.load(f)
+        self._user_vectors = {}
         print(f"SVD++ model loaded from {path}")
 
 if __name__ == "__main__":
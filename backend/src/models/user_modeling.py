@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from models.genres import parse_genres
+
 class DynamicUserProfiler:
     """
     Multi-dimensional user profile that adapts to context.
@@ -31,12 +33,11 @@ class DynamicUserProfiler:
         user_movies = user_data.merge(self.movies, on='movieId')
         genre_scores = {}
         
-        for _, row in user_movies.iterrows():
-            genres = eval(row['genres']) if isinstance(row['genres'], str) else row['genres']
-            for genre in genres:
+        for genres, rating in zip(user_movies['genres'].tolist(), user_movies['rating'].tolist()):
+            for genre in parse_genres(genres):
                 if genre not in genre_scores:
                     genre_scores[genre] = []
-                genre_scores[genre].append(row['rating'])
+                genre_scores[genre].append(rating)
         
         genre_affinity = {g: np.mean(scores) for g, scores in genre_scores.items()}
         
@@ -55,9 +56,12 @@ class DynamicUserProfiler:
         return profile
     
     def get_profile(self, user_id):
-        """Get or create user profile."""
+        """
+        Get or create user profile. Cached per user, including the None of a
+        user without ratings, so repeat calls within a request are lookups.
+        """
         if user_id not in self.user_profiles:
-            return self.build_user_profile(user_id)
+            self.user_profiles[user_id] = self.build_user_profile(user_id)
         return self.user_profiles[user_id]
 
 
@@ -106,29 +110,30 @@ class ContextEngine:
         }
         return device_prefs.get(device, {})
     
-    def adjust_score_by_context(self, base_score, movie_metadata, context_type='weekday_evening', device='desktop'):
+    def build_genre_multiplier(self, context_type='weekday_evening'):
         """
-        Adjust recommendation score based on context.
+        Temporal boost by genre for a context; a movie gets the boost once if
+        any of its genres is listed (unlisted genres: 1.0).
         """
-        adjusted_score = base_score
-        
-        # Temporal adjustment (simplified)
         if context_type == 'weekend':
             # Boost epic/long films on weekends
-            if 'Action' in movie_metadata.get('genres', []) or 'Adventure' in movie_metadata.get('genres', []):
-                adjusted_score *= 1.1
+            return {'Action': 1.1, 'Adventure': 1.1}
         elif context_type == 'weekday_evening':
             # Boost lighter content on weekday evenings
-            if 'Comedy' in movie_metadata.get('genres', []) or 'Romance' in movie_metadata.get('genres', []):
-                adjusted_score *= 1.05
-        
-        # Device adjustment
-        device_ctx = self.get_device_context(device)
-        if 'niche_boost' in device_ctx:
-            # Desktop users prefer niche content
-            adjusted_score *= device_ctx['niche_boost']
-        
-        return adjusted_score
+            return {'Comedy': 1.05, 'Romance': 1.05}
+        return {}
+    
+    def device_multiplier(self, device='desktop'):
+        """Device boost applied to every score (desktop users prefer niche content)."""
+        return self.get_device_context(device).get('niche_boost', 1.0)
+    
+    def adjust_score_by_context(self, base_score, movie_metadata, context_type='weekday_evening', device='desktop'):
+        """
+        Adjust recommendation score based on context.
+        """
+        genre_boost = self.build_genre_multiplier(context_type)
+        temporal = max((genre_boost.get(g, 1.0) for g in movie_metadata.get('genres', [])), default=1.0)
+        return base_score * temporal * self.device_multiplier(device)
 
 
 if __name__ == "__main__":
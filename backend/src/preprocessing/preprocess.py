@@ -11,6 +11,7 @@ from sklearn.preprocessing import LabelEncoder
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from config import RAW_DATA_DIR, PROCESSED_DATA_DIR, ENCODER_DIR, get_processed_file_path, get_encoder_file_path
+from src.data_store import write_processed
 
 
 def load_data(data_path=None):
@@ -97,19 +98,14 @@ def split_data(ratings, test_ratio=0.2, time_based=True):
     """
     if time_based:
         ratings = ratings.sort_values(['userId', 'timestamp'])
-        train_indices = []
-        test_indices = []
-
-        for user_id, group in ratings.groupby('userId'):
-            n = len(group)
-            split_point = int(n * (1 - test_ratio))
-            if split_point < 1:
-                split_point = 1
-            train_indices.extend(group.iloc[:split_point].index)
-            test_indices.extend(group.iloc[split_point:].index)
-
-        train_df = ratings.loc[train_indices]
-        test_df = ratings.loc[test_indices]
+        by_user = ratings.groupby('userId')
+        # Position of each rating in its user's timeline vs. that user's split point
+        n = by_user['userId'].transform('size').to_numpy()
+        split_point = np.maximum((n * (1 - test_ratio)).astype(int), 1)
+        train_mask = by_user.cumcount().to_numpy() < split_point
+
+        train_df = ratings[train_mask]
+        test_df = ratings[~train_mask]
     else:
         from sklearn.model_selection import train_test_split
         train_df, test_df = train_test_split(ratings, test_size=test_ratio, random_state=42)
@@ -197,10 +193,11 @@ def run_preprocessing(data_path=None, output_path=None):
     # --- Save processed data ---
     os.makedirs(output_path, exist_ok=True)
 
-    train_df.to_csv(os.path.join(output_path, 'train_ratings.csv'), index=False)
-    test_df.to_csv(os.path.join(output_path, 'test_ratings.csv'), index=False)
-    movies.to_csv(os.path.join(output_path, 'movies_cleaned.csv'), index=False)
-    tags.to_csv(os.path.join(output_path, 'tags_cleaned.csv'), index=False)
+    write_processed(train_df, os.path.join(output_path, 'train_ratings.csv'))
+    write_processed(test_df, os.path.join(output_path, 'test_ratings.csv'))
+    # Genre lists: JSON text in the CSV, a native list column in the Parquet snapshot
+    write_processed(movies, os.path.join(output_path, 'movies_cleaned.csv'), json_columns=['genres_list'])
+    write_processed(tags, os.path.join(output_path, 'tags_cleaned.csv'))
 
     # Save encoders
     import joblib
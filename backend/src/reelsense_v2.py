@@ -96,8 +96,7 @@ class ReelSensePlusPlus:
         Generate "Why you might NOT like this" disclaimer.
         Based on genre mismatch or low user affinity.
         """
-        movie_data = self.movies[self.movies['movieId'] == movie_id].iloc[0]
-        genres = eval(movie_data['genres']) if isinstance(movie_data['genres'], str) else movie_data['genres']
+        genres = self.hybrid.genres_arr[self.hybrid.movie_idx[movie_id]]
         
         user_profile = self.hybrid.profiler.get_profile(user_id)
         
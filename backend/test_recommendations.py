@@ -19,11 +19,11 @@ try:
     
     # Test data loading
     print("\n2. Testing data loading...")
-    import pandas as pd
     from config import get_processed_file_path
+    from src.data_store import read_processed
     
-    movies_df = pd.read_csv(get_processed_file_path('movies_cleaned.csv'))
-    train_df = pd.read_csv(get_processed_file_path('train_ratings.csv'))
+    movies_df = read_processed(get_processed_file_path('movies_cleaned.csv'))
+    train_df = read_processed(get_processed_file_path('train_ratings.csv'))
     print(f"   ✅ Loaded {len(movies_df):,} movies")
     print(f"   ✅ Loaded {len(train_df):,} ratings")
     
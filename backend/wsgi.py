@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers.
+
+Importing app loads the models and data once. Run gunicorn with --preload
+so that happens in the master process and the workers share those pages
+copy-on-write instead of each loading its own copy:
+
+    gunicorn -w 4 -k gthread --threads 4 --preload wsgi:app
+"""
+from app import app